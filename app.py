@@ -4,14 +4,20 @@ import os
 import requests
 from dotenv import load_dotenv
 from auth import initialize_session_state, login_page, register_page, show_user_info, logout
-from chat import display_chat_interface, load_chat_history, display_chat_history
+from chat import display_chat_interface, load_chat_history, display_chat_history, get_chat_chain
 from dashboard import display_dashboard
 from my_profile import display_profile_update
 from emotional_diary_page import display_emotional_diary
-from database import SupabaseClient
+from emotional_diary import get_diary_chain, get_emotion_chain
+from llm_registry import warm_up
+from persistence import get_writer
+from database import get_db
+from webhook_client import get_webhook_client, WebhookError
+from upload_cache import content_hash, get_upload_cache
+from ocr_engine import OCR_MODE, get_ocr_engine
+from image_preprocessing import normalize_upload
 from groq import Groq
 from pathlib import Path
-import time
 import tempfile
 import gtts
 from gtts import gTTS
@@ -32,7 +38,8 @@ speech_file_path = Path(__file__).parent / "speech.mp3"
 N8N_CHATBOT_URL = os.getenv("N8N_CHATBOT_URL", "webhook-endpoint")
 N8N_FILE_UPLOAD_URL = os.getenv("N8N_FILE_UPLOAD_URL", "webhook-endpoint")
 user_id = None
-web_url = "webhook-endpoint"
+# How often the chat page checks on uploads still being processed in the background
+UPLOAD_POLL_SECONDS = float(os.getenv("UPLOAD_POLL_SECONDS", "2"))
 
 def generate_audio(text, key_suffix=""):
     """Generate audio from text using gTTS and return the file path"""
@@ -107,6 +114,68 @@ def cleanup_temp_files():
             except:
                 pass
 
+def extract_document(filename, content, content_type, ids, user_id, digest):
+    """Background job: extract a document's text (locally or via n8n) and store it under the file's hash"""
+    # Phone photos are rotated, shrunk to OCR resolution and recompressed before they go anywhere
+    filename, content, content_type = normalize_upload(filename, content, content_type)
+    if OCR_MODE == "local":
+        extracted_text = get_ocr_engine().extract_text(content, filename)
+    else:
+        extracted_text = get_webhook_client().upload_file(filename, content, content_type, ids, user_id)
+    if not extracted_text or len(extracted_text.strip()) == 0:
+        extracted_text = "File processed successfully, but no text content was extracted."
+    saved = get_db().save_extracted_document(user_id, extracted_text, digest)
+    if saved:
+        get_upload_cache().set(user_id, digest, extracted_text)
+    return {'text': extracted_text, 'saved': saved}
+
+def document_message(filename, extracted_text, previously=False):
+    """Chat message presenting the text extracted from a document"""
+    intro = f"I've already processed '{filename}' before" if previously else f"I've processed your file '{filename}'"
+    return f"{intro}. Here's what I extracted:\n\n{extracted_text}\n\n(Use the chat input below to ask me questions about this document)"
+
+def upload_error_message(error):
+    """Chat message for an upload job that failed"""
+    if isinstance(error, WebhookError):
+        return f"Error processing file (Status: {error.status_code}). Please try again."
+    if isinstance(error, requests.exceptions.Timeout):
+        return "❌ Request timed out. Please try again with a smaller file."
+    return f"❌ An error occurred: {str(error)}"
+
+@st.fragment(run_every=UPLOAD_POLL_SECONDS)
+def display_pending_uploads():
+    """Show uploads still being processed and move finished ones into the chat"""
+    finished = False
+    for upload in list(st.session_state.pending_uploads):
+        client = get_webhook_client()
+        job = client.pop_job(upload['job_id'])
+        if job is None and client.job_status(upload['job_id']) is not None:
+            with st.chat_message("assistant", avatar="🤖"):
+                st.write(f"⏳ Still processing '{upload['filename']}'... You can keep chatting in the meantime.")
+            continue
+
+        st.session_state.pending_uploads.remove(upload)
+        finished = True
+        if job is None:
+            message = f"❌ Processing of '{upload['filename']}' was interrupted. Please upload it again."
+        elif job['status'] == 'failed':
+            message = upload_error_message(job['error'])
+        else:
+            extracted_text = job['result']['text']
+            if not job['result']['saved']:
+                st.session_state.chat_messages.append(
+                    {"role": "assistant", "content": "❌ Database error: the extracted text could not be saved."})
+            st.session_state.response_history.append({
+                "type": "file",
+                "filename": upload['filename'],
+                "response": extracted_text
+            })
+            message = document_message(upload['filename'], extracted_text)
+        st.session_state.chat_messages.append({"role": "assistant", "content": message})
+
+    if finished:
+        st.rerun()
+
 def display_chatbot():
     """Display the chatbot page with interface and history options"""
     st.title('Swasthya AI Chatbot 🏥')
@@ -117,6 +186,9 @@ def display_chatbot():
     if "message_counter" not in st.session_state:
         st.session_state.message_counter = 0
 
+    if "pending_uploads" not in st.session_state:
+        st.session_state.pending_uploads = []
+
     col1, col2 = st.columns([5, 1])
     with col2:
         if st.button("Back to Dashboard", use_container_width=True):
@@ -156,6 +228,9 @@ def display_chatbot():
                 if message["role"] == "assistant" and len(message["content"]) > 50:
                     display_audio_player(message["content"], f"msg_{idx}")
 
+        if st.session_state.pending_uploads:
+            display_pending_uploads()
+
         # File upload section
         uploaded_file = st.file_uploader(
             "Upload a medical document (optional)", 
@@ -164,6 +239,7 @@ def display_chatbot():
         )
 
         if uploaded_file is not None:
+            reprocess = st.checkbox("Process again even if this file was uploaded before", key="force_reprocess")
             if st.button("📤 Process this file", use_container_width=True):
                 st.session_state.message_counter += 1
                 file_message = f"📄 Uploaded file: {uploaded_file.name}"
@@ -172,68 +248,27 @@ def display_chatbot():
                 with st.chat_message("user", avatar="👤"):
                     st.write(file_message)
 
-                with st.chat_message("assistant", avatar="🤖"):
-                    thinking_placeholder = st.empty()
-                    for i in range(3):
-                        thinking_placeholder.write("Processing" + "." * (i + 1))
-                        time.sleep(0.5)
-
-                    with st.spinner("Processing your file..."):
-                        try:
-                            from database import SupabaseClient
-                            base = SupabaseClient()
-                            client_db = base.client
-                            res = client_db.table('medical_info').select('id').eq('user_id', st.session_state['user_id']).execute()
-                            ids = [item['id'] for item in res.data]
-
-                            response = requests.post(
-                                web_url,
-                                files={'data': (uploaded_file.name, uploaded_file, uploaded_file.type)},
-                                data={'name': uploaded_file.name, "id": ids, "userId": st.session_state['user_id']},
-                            )
-
-                            if response.status_code == 200:
-                                extracted_text = response.text
-                                
-                                if not extracted_text or len(extracted_text.strip()) == 0:
-                                    extracted_text = "File processed successfully, but no text content was extracted."
-
-                                st.session_state.response_history.append({
-                                    "type": "file",
-                                    "filename": uploaded_file.name,
-                                    "response": extracted_text
-                                })
-
-                                message = f"I've processed your file '{uploaded_file.name}'. Here's what I extracted:\n\n{extracted_text}\n\n(Use the chat input below to ask me questions about this document)"
-                                st.session_state.chat_messages.append({"role": "assistant", "content": message})
-
-                                try:
-                                    client_db.table('medicalinfo').insert({
-                                        'user_id': st.session_state['user_id'],
-                                        'content': extracted_text
-                                    }).execute()
-                                except Exception as e:
-                                    st.error(f"❌ Database error: {str(e)}")
-
-                                thinking_placeholder.write(message)
-                                
-                                # Add audio player for the response
-                                display_audio_player(message, f"file_{st.session_state.message_counter}")
-                                
-                            else:
-                                error_msg = f"Error processing file (Status: {response.status_code}). Please try again."
-                                thinking_placeholder.write(error_msg)
-                                st.session_state.chat_messages.append({"role": "assistant", "content": error_msg})
-
-                        except requests.exceptions.Timeout:
-                            error_msg = "❌ Request timed out. Please try again with a smaller file."
-                            thinking_placeholder.write(error_msg)
-                            st.session_state.chat_messages.append({"role": "assistant", "content": error_msg})
-                        except Exception as e:
-                            error_msg = f"❌ An error occurred: {str(e)}"
-                            thinking_placeholder.write(error_msg)
-                            st.session_state.chat_messages.append({"role": "assistant", "content": error_msg})
+                # The same file uploaded again gets its stored extraction instead of another n8n run
+                digest = content_hash(uploaded_file)
+                extracted_text = None if reprocess else get_upload_cache().get(st.session_state['user_id'], digest)
+                if extracted_text is not None:
+                    st.session_state.response_history.append({
+                        "type": "file",
+                        "filename": uploaded_file.name,
+                        "response": extracted_text
+                    })
+                    st.session_state.chat_messages.append(
+                        {"role": "assistant", "content": document_message(uploaded_file.name, extracted_text, True)})
+                    st.rerun()
 
+                # Extraction can take minutes (n8n's Drive upload, OCR, the agent); poll for the result instead of blocking
+                medical_info = get_db().get_user_medical_info(st.session_state['user_id'])
+                ids = [item['id'] for item in medical_info]
+                job_id = get_webhook_client().submit(
+                    extract_document, uploaded_file.name, uploaded_file.getvalue(), uploaded_file.type,
+                    ids, st.session_state['user_id'], digest
+                )
+                st.session_state.pending_uploads.append({'job_id': job_id, 'filename': uploaded_file.name})
                 st.rerun()
 
         # Chat input
@@ -246,40 +281,30 @@ def display_chatbot():
 
             with st.chat_message("assistant", avatar="🤖"):
                 thinking_placeholder = st.empty()
-                for i in range(3):
-                    thinking_placeholder.write("Thinking" + "." * (i + 1))
-                    time.sleep(0.3)
+                thinking_placeholder.write("Thinking...")
 
                 with st.spinner("Getting your answer..."):
                     try:
-                        response = requests.post(
-                            web_url,
-                            json={'chatInput': prompt, "userId": st.session_state['user_id']},
-                            timeout=30
-                        )
-
-                        if response.status_code == 200:
-                            response_text = response.text
-                            if not response_text or len(response_text.strip()) == 0:
-                                response_text = "I apologize, but I couldn't generate a response. Please try rephrasing your question."
-
-                            st.session_state.response_history.append({
-                                "type": "text",
-                                "prompt": prompt,
-                                "response": response_text
-                            })
-
-                            st.session_state.chat_messages.append({"role": "assistant", "content": response_text})
-                            thinking_placeholder.write(response_text)
-                            
-                            # Add audio player for the response
-                            display_audio_player(response_text, f"chat_{st.session_state.message_counter}")
-                            
-                        else:
-                            error_msg = f"❌ Server error (Status: {response.status_code}). Please try again."
-                            thinking_placeholder.write(error_msg)
-                            st.session_state.chat_messages.append({"role": "assistant", "content": error_msg})
+                        response_text = get_webhook_client().send_chat(prompt, st.session_state['user_id'])
+                        if not response_text or len(response_text.strip()) == 0:
+                            response_text = "I apologize, but I couldn't generate a response. Please try rephrasing your question."
+
+                        st.session_state.response_history.append({
+                            "type": "text",
+                            "prompt": prompt,
+                            "response": response_text
+                        })
+
+                        st.session_state.chat_messages.append({"role": "assistant", "content": response_text})
+                        thinking_placeholder.write(response_text)
+                        
+                        # Add audio player for the response
+                        display_audio_player(response_text, f"chat_{st.session_state.message_counter}")
 
+                    except WebhookError as e:
+                        error_msg = f"❌ Server error (Status: {e.status_code}). Please try again."
+                        thinking_placeholder.write(error_msg)
+                        st.session_state.chat_messages.append({"role": "assistant", "content": error_msg})
                     except requests.exceptions.Timeout:
                         error_msg = "❌ Request timed out. Please try again."
                         thinking_placeholder.write(error_msg)
@@ -308,9 +333,19 @@ def main():
     if 'app_started' not in st.session_state:
         cleanup_temp_files()
         st.session_state['app_started'] = True
+
+    # Build the shared LLM chains once per process
+    warm_up([get_chat_chain, get_diary_chain, get_emotion_chain])
+
+    # Start the background writer, which also saves any rows spooled before a crash
+    get_writer()
     
     # Display user info in sidebar
     show_user_info()
+
+    # Pages fall back to cached data while the database is failing; say so
+    if get_db().is_degraded():
+        st.warning("We're having trouble reaching the database. Some information may be out of date.")
     
     # Main content
     if not st.session_state['logged_in']:
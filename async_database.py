@@ -0,0 +1,74 @@
+# async_database.py
+
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+from database import get_db
+
+# Time budget for all of a page's reads together
+PAGE_LOAD_DEADLINE = float(os.getenv("PAGE_LOAD_DEADLINE", "8"))
+
+# Not the event loop's default executor: asyncio.run would wait on it for reads past the deadline
+_read_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="page-read")
+
+
+class AsyncSupabaseClient:
+    """asyncio facade over the pooled SupabaseClient.
+
+    Every SupabaseClient method is available as a coroutine that runs the blocking call
+    in a worker thread, so independent reads can be awaited together.
+    """
+
+    def __init__(self, db=None):
+        self.db = db or get_db()
+
+    def __getattr__(self, name):
+        method = getattr(self.db, name)
+        if not callable(method):
+            return method
+
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_read_executor, functools.partial(method, *args, **kwargs))
+
+        return call
+
+    async def gather(self, reads, deadline=PAGE_LOAD_DEADLINE):
+        """Run {key: (method name, args, default)} reads concurrently under one deadline.
+
+        Returns {key: result}; reads still running at the deadline get their default.
+        """
+        async def timed(key, name, args):
+            started = time.perf_counter()
+            try:
+                return await getattr(self, name)(*args)
+            finally:
+                metrics.record_timing(f"db_read_{key}", time.perf_counter() - started)
+
+        tasks = {key: asyncio.create_task(timed(key, name, args)) for key, (name, args, _) in reads.items()}
+        done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            metrics.increment("page_load_deadline_exceeded")
+
+        results = {}
+        for key, task in tasks.items():
+            default = reads[key][2]
+            if task in done and task.exception() is None:
+                results[key] = task.result()
+            else:
+                results[key] = default
+        return results
+
+
+def fetch_page_data(page, reads, deadline=PAGE_LOAD_DEADLINE, db=None):
+    """Load a page's independent reads concurrently from synchronous (Streamlit) code.
+
+    The whole fetch is recorded as the {page}_page_load timing.
+    """
+    with metrics.timer(f"{page}_page_load"):
+        return asyncio.run(AsyncSupabaseClient(db).gather(reads, deadline))
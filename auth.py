@@ -2,7 +2,9 @@
 
 import streamlit as st
 import bcrypt
-from database import SupabaseClient
+import time
+import metrics
+from database import get_db, DatabaseReadError
 
 
 def hash_password(password):
@@ -340,8 +342,12 @@ def login_page():
             return
 
         # Attempt to log in the user
-        db = SupabaseClient()
-        user = db.get_user_by_email(email)
+        db = get_db()
+        try:
+            user = db.get_user_by_email(email)
+        except DatabaseReadError:
+            st.error("⚠️ Service Unavailable: We could not reach your account right now. Please try again shortly.")
+            return
 
         if user and verify_password(user['password_hash'], password):
             # Set session state
@@ -511,8 +517,13 @@ def register_page():
             }
 
             # Create user in database
-            db = SupabaseClient()
-            existing_user = db.get_user_by_email(email)
+            registration_started = time.perf_counter()
+            db = get_db()
+            try:
+                existing_user = db.get_user_by_email(email)
+            except DatabaseReadError:
+                st.error("⚠️ Service Unavailable: We could not check whether this email is registered. Please try again shortly.")
+                return
 
             if existing_user:
                 st.error("📧 Registration Error: This email address is already registered. Please use a different email or proceed to login.")
@@ -523,6 +534,7 @@ def register_page():
             if user:
                 # Add medical info
                 db.create_medical_info(user['id'], medical_conditions)
+                metrics.record_timing('registration', time.perf_counter() - registration_started)
 
                 st.success("✅ Registration Successful: Your medical profile has been created. You may now access the platform using your credentials.")
                 
@@ -560,7 +572,7 @@ def show_user_info():
         unsafe_allow_html=True)
 
         # Get user medical info
-        db = SupabaseClient()
+        db = get_db()
         medical_info = db.get_user_medical_info(st.session_state['user_id'])
 
         if medical_info:
@@ -0,0 +1,506 @@
+# benchmarks.py
+
+import argparse
+import os
+import time
+
+
+def _time_per_call(fn, repeat):
+    """Return the mean seconds per call of fn over repeat runs"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_llm_construction(repeat=200):
+    """Compare rebuilding the chat model and chain per message with the shared registry"""
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_community.llms import Ollama
+    from chat import get_prompt_template, get_chat_chain
+
+    def rebuild():
+        return get_prompt_template() | Ollama(model="tinyllama") | StrOutputParser()
+
+    get_chat_chain()
+    rebuilt = _time_per_call(rebuild, repeat)
+    cached = _time_per_call(get_chat_chain, repeat)
+    print(f"chain construction per message: rebuilt {rebuilt * 1000:.3f} ms, "
+          f"registry {cached * 1000:.4f} ms ({rebuilt / cached:.0f}x)")
+
+
+# Small labelled diary fixture set for the emotion classifier benchmark
+EMOTION_FIXTURES = [
+    ("I had a great day with friends and laughed the whole evening", "happy"),
+    ("I can't stop crying since the funeral", "sad"),
+    ("I'm so mad at my boss for taking credit for my work", "angry"),
+    ("My heart races every time I think about tomorrow's interview", "anxious"),
+    ("Not sure what to do about this situation, nothing makes sense", "confused"),
+    ("Things are hard now but I think next month will be better", "hopeful"),
+    ("Thank you to my sister for staying with me through the surgery", "grateful"),
+    ("We leave for the trip tomorrow and I can barely sit still!", "excited"),
+    ("What if the test results come back bad?", "worried"),
+    ("I feel completely drained after the night shift", "tired"),
+    ("The app crashed again and I lost an hour of work", "frustrated"),
+    ("Too many deadlines, kids are sick, I can't keep up with anything", "overwhelmed"),
+    ("Took a slow walk by the lake and my mind felt still", "calm"),
+    ("Sitting in the garden with tea, everything feels at peace", "peaceful"),
+    ("Dinner was simple and the evening was nice, I'm satisfied", "content"),
+    ("Went to the office, had lunch, came home", "neutral"),
+    ("I studied for weeks and still did not get the scholarship", "disappointed"),
+    ("Nobody called on my birthday and the flat feels empty", "lonely"),
+    ("I finally finished my first marathon!", "proud"),
+    ("Exams, rent and work are piling up and my shoulders are tight", "stressed"),
+]
+
+
+def bench_emotion_classifier():
+    """Compare throughput and accuracy of the local classifier with the LLM prompt"""
+    from emotion_classifier import get_local_classifier
+    from emotional_diary import classify_emotion_llm
+
+    texts = [text for text, _ in EMOTION_FIXTURES]
+    labels = [label for _, label in EMOTION_FIXTURES]
+
+    start = time.perf_counter()
+    classifier = get_local_classifier()
+    print(f"local classifier load: {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    local = [label for label, _ in classifier.classify(texts)]
+    local_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    llm = [classify_emotion_llm(text) for text in texts]
+    llm_elapsed = time.perf_counter() - start
+
+    for name, predictions, elapsed in (("local", local, local_elapsed), ("llm", llm, llm_elapsed)):
+        accuracy = sum(p == label for p, label in zip(predictions, labels)) / len(labels)
+        print(f"{name}: {len(texts) / elapsed:.1f} entries/s, accuracy {accuracy:.0%}")
+
+
+def _synthetic_diary_entries(count):
+    """Build diary rows shaped like Supabase output, with a few non-ISO stragglers"""
+    import random
+    from datetime import datetime, timedelta
+
+    moods = ["happy", "sad", "calm", "anxious", "grateful", "tired"]
+    start = datetime(2023, 1, 1)
+    entries = []
+    for i in range(count):
+        created = start + timedelta(minutes=37 * i, microseconds=i % 997)
+        created_at = created.isoformat() + "+00:00" if i % 50 else created.strftime("%d/%m/%Y %H:%M:%S")
+        entries.append({"created_at": created_at, "mood": random.choice(moods), "entry": "Today was a day"})
+    return entries
+
+
+def bench_mood_data(sizes=(1_000, 10_000, 100_000)):
+    """Compare the row-by-row mood frame build with the vectorized prepare_mood_data"""
+    import pandas as pd
+    from mood_visualizations import (prepare_mood_data, parse_datetime_flexible, extract_mood_from_entry,
+                                     MOOD_VALUES, TIMESTAMP_FIELDS)
+
+    def row_by_row(entries):
+        rows = []
+        for entry in entries:
+            timestamp_str = next((entry[f] for f in TIMESTAMP_FIELDS if f in entry and entry[f]), None)
+            parsed = parse_datetime_flexible(timestamp_str) if timestamp_str else None
+            if parsed:
+                mood = extract_mood_from_entry(entry)
+                rows.append((parsed.date(), parsed, mood, MOOD_VALUES.get(mood.lower(), 3)))
+        df = pd.DataFrame(rows, columns=['date', 'timestamp', 'mood', 'mood_value'])
+        return df.sort_values('timestamp').reset_index(drop=True)
+
+    for size in sizes:
+        entries = _synthetic_diary_entries(size)
+        start = time.perf_counter()
+        row_by_row(entries)
+        baseline = time.perf_counter() - start
+        start = time.perf_counter()
+        prepare_mood_data(entries)
+        vectorized = time.perf_counter() - start
+        print(f"prepare_mood_data x{size}: row-by-row {baseline * 1000:.0f} ms, "
+              f"vectorized {vectorized * 1000:.0f} ms ({baseline / vectorized:.1f}x)")
+
+
+def bench_mood_timeline(sizes=(1_000, 10_000, 100_000)):
+    """Compare timeline payload size and build time with and without downsampling"""
+    from mood_visualizations import prepare_mood_data, build_mood_timeline_figure, downsample_mood_timeline
+
+    for size in sizes:
+        df = prepare_mood_data(_synthetic_diary_entries(size))
+        for label, frame in (("full", df), ("downsampled", downsample_mood_timeline(df))):
+            start = time.perf_counter()
+            payload = build_mood_timeline_figure(frame).to_json()
+            elapsed = time.perf_counter() - start
+            print(f"mood timeline x{size} {label}: {len(frame)} points, "
+                  f"{len(payload) / 1024:.0f} KiB, {elapsed * 1000:.0f} ms")
+
+
+def bench_summary_prompt(sizes=(10, 100, 1_000)):
+    """Compare chat prompt size as history grows: every turn verbatim vs summary prefix plus recent turns"""
+    from chat import get_prompt_template, get_conversation_context, CHAT_TURN_FIELDS
+    from conversation_summary import SUMMARY_RECENT_TURNS, SUMMARY_MAX_TOKENS
+    from prompt_builder import count_tokens, format_turn, truncate_to_tokens
+
+    template = get_prompt_template()
+
+    def prompt_tokens(context):
+        return count_tokens(template.format(question="How should I manage my blood pressure this week?",
+                                            medical_conditions="hypertension", conversation_context=context))
+
+    for size in sizes:
+        history = [{"question": f"Question {i}: is it fine to skip my evening walk when it rains?",
+                    "answer": f"Answer {i}: " + "Try a short indoor routine instead, stay hydrated. " * 6}
+                   for i in range(size)]
+        older, recent = history[:-SUMMARY_RECENT_TURNS], history[-SUMMARY_RECENT_TURNS:]
+        # Without an LLM at hand, stand in a summary at its SUMMARY_MAX_TOKENS cap (the worst case)
+        summary = truncate_to_tokens("".join(format_turn(turn, CHAT_TURN_FIELDS) for turn in older),
+                                     SUMMARY_MAX_TOKENS) if older else None
+
+        verbatim = "".join(format_turn(turn, CHAT_TURN_FIELDS, max_tokens=10 ** 9) for turn in history)
+        summarized = get_conversation_context(recent, max_context=SUMMARY_RECENT_TURNS, summary=summary)
+        print(f"chat prompt with {size} turns of history: verbatim {prompt_tokens(verbatim)} tokens, "
+              f"summary + recent {prompt_tokens(summarized)} tokens")
+
+
+def bench_page_load(latency=0.05):
+    """Compare sequential and concurrent page reads against a stand-in backend with fixed per-call latency"""
+    from async_database import fetch_page_data
+    from fault_injection import make_client
+
+    db, injector = make_client()
+    injector.latency = latency
+    pages = {
+        'dashboard': {
+            'recent_entries': ('get_recent_emotional_diary_entries', ('u1', 10, 'mood, created_at'), None),
+            'rollups': ('get_mood_rollups', ('u1',), None),
+        },
+        'profile': {
+            'user': ('get_user_by_id', ('u1',), None),
+            'medical_info': ('get_user_medical_info', ('u1',), []),
+        },
+    }
+    for page, reads in pages.items():
+        start = time.perf_counter()
+        for name, args, _ in reads.values():
+            getattr(db, name)(*args)
+        sequential = time.perf_counter() - start
+        start = time.perf_counter()
+        fetch_page_data(page, reads, db=db)
+        concurrent = time.perf_counter() - start
+        print(f"{page} page reads at {latency * 1000:.0f} ms per call: sequential {sequential * 1000:.0f} ms, "
+              f"concurrent {concurrent * 1000:.0f} ms")
+
+
+def bench_sqlite_backend(users=50, chats_per_user=2_000, diary_per_user=1_000, path=":memory:"):
+    """Time common SupabaseClient reads on the SQLite backend at realistic history sizes"""
+    from datetime import datetime, timedelta
+    from database import SupabaseClient, UserCache
+    from sqlite_backend import SQLiteClientPool
+
+    db = SupabaseClient(SQLiteClientPool(path), UserCache(ttl=0))
+    client = db.client
+    start_time = datetime(2024, 1, 1)
+    start = time.perf_counter()
+    for u in range(users):
+        user_id = f"00000000-0000-0000-0000-{u:012d}"
+        client.table('users1').insert({'id': user_id, 'email': f"user{u}@example.com", 'password_hash': 'x',
+                                       'full_name': f"User {u}", 'age': 40, 'gender': 'Other',
+                                       'contact_no': '0'}).execute()
+        client.table('chat_history').insert([
+            {'user_id': user_id, 'question': f"Question {i}", 'answer': "Answer " * 40,
+             'created_at': (start_time + timedelta(minutes=13 * i)).isoformat() + "+00:00"}
+            for i in range(chats_per_user)]).execute()
+        entries = [{'user_id': user_id, 'entry': "Today was a day", 'response': "Thanks for sharing", 'mood': "calm",
+                    'created_at': (start_time + timedelta(minutes=29 * i)).isoformat() + "+00:00"}
+                   for i in range(diary_per_user)]
+        client.table('emotional_diary').insert(entries).execute()
+        db.rebuild_mood_rollups(user_id, entries)
+    print(f"sqlite seed: {users} users, {users * (chats_per_user + diary_per_user)} history rows "
+          f"in {time.perf_counter() - start:.1f} s")
+
+    user_id = f"00000000-0000-0000-0000-{users // 2:012d}"
+    operations = {
+        'get_user_by_email': lambda: db.get_user_by_email(f"user{users // 2}@example.com"),
+        'get_recent_chat_history': lambda: db.get_recent_chat_history(user_id, limit=5),
+        'get_chat_history_page': lambda: db.get_chat_history_page(user_id, limit=200),
+        'get_recent_emotional_diary_entries': lambda: db.get_recent_emotional_diary_entries(user_id, limit=10),
+        'get_mood_rollups': lambda: db.get_mood_rollups(user_id),
+        'get_emotional_diary_history': lambda: db.get_emotional_diary_history(user_id),
+    }
+    for name, operation in operations.items():
+        print(f"sqlite {name}: {_time_per_call(operation, 50) * 1000:.2f} ms")
+
+
+def bench_webhook(calls=50, uploads=4, chat_latency=0.005, upload_latency=0.3):
+    """Compare bare requests.post with the pooled webhook client, and blocking uploads with background jobs"""
+    import requests
+    from mock_n8n import MockN8NServer
+    from webhook_client import WebhookClient
+
+    server = MockN8NServer(chat_latency=chat_latency, upload_latency=upload_latency).start()
+    try:
+        def bare():
+            requests.post(server.url, json={'chatInput': "What should I eat?", "userId": "u1"}, timeout=30)
+
+        opened = server.counters['connections']
+        per_call = _time_per_call(bare, calls)
+        print(f"chat via bare requests.post: {per_call * 1000:.1f} ms per call, "
+              f"{server.counters['connections'] - opened} connections for {calls} calls")
+
+        client = WebhookClient(server.url)
+        opened = server.counters['connections']
+        per_call = _time_per_call(lambda: client.send_chat("What should I eat?", "u1"), calls)
+        print(f"chat via pooled session: {per_call * 1000:.1f} ms per call, "
+              f"{server.counters['connections'] - opened} connections for {calls} calls")
+
+        content = b"%PDF-1.4 " + b"0" * 200_000
+        start = time.perf_counter()
+        for i in range(uploads):
+            client.upload_file(f"report{i}.pdf", content, "application/pdf", [], "u1")
+        blocking = time.perf_counter() - start
+
+        start = time.perf_counter()
+        job_ids = [client.submit_upload(f"report{i}.pdf", content, "application/pdf", [], "u1")
+                   for i in range(uploads)]
+        submitted = time.perf_counter() - start
+        while any(client.job_status(job_id)['status'] == 'running' for job_id in job_ids):
+            time.sleep(0.01)
+        completed = time.perf_counter() - start
+        print(f"{uploads} uploads at {upload_latency * 1000:.0f} ms each: blocking {blocking * 1000:.0f} ms; "
+              f"jobs return in {submitted * 1000:.1f} ms and finish in {completed * 1000:.0f} ms")
+        client.close()
+    finally:
+        server.stop()
+
+
+def bench_upload_cache(uploads=20, upload_latency=0.3, size=2_000_000):
+    """Compare sending a repeated upload to the mock webhook with serving it from the content-hash cache"""
+    import io
+    from database import SupabaseClient, UserCache
+    from mock_n8n import MockN8NServer
+    from sqlite_backend import SQLiteClientPool
+    from upload_cache import UploadCache, content_hash
+    from webhook_client import WebhookClient
+
+    server = MockN8NServer(upload_latency=upload_latency).start()
+    db = SupabaseClient(SQLiteClientPool(":memory:"), UserCache(ttl=0))
+    db.client.table('users1').insert({'id': 'u1', 'email': 'u1@example.com', 'password_hash': 'x', 'full_name': 'U',
+                                      'age': 40, 'gender': 'Other', 'contact_no': '0'}).execute()
+    client = WebhookClient(server.url)
+    upload = io.BytesIO(b"%PDF-1.4 " + b"1" * size)
+    try:
+        hash_seconds = _time_per_call(lambda: content_hash(upload), uploads)
+        digest = content_hash(upload)
+
+        start = time.perf_counter()
+        text = client.upload_file("report.pdf", upload.getvalue(), "application/pdf", [], "u1")
+        db.save_extracted_document('u1', text, digest)
+        uncached = time.perf_counter() - start
+
+        cold = UploadCache(db=db)
+        start = time.perf_counter()
+        cold.get('u1', digest)
+        from_db = time.perf_counter() - start
+        from_memory = _time_per_call(lambda: cold.get('u1', digest), uploads)
+        print(f"repeated {size / 1e6:.0f} MB upload: n8n round trip {uncached * 1000:.0f} ms; "
+              f"sha-256 {hash_seconds * 1000:.1f} ms + lookup {from_db * 1000:.2f} ms (database) / "
+              f"{from_memory * 1000:.3f} ms (memory); stats {cold.stats()}")
+    finally:
+        client.close()
+        server.stop()
+
+
+def _sample_pages(pages=4, width=1240, height=1754):
+    """Synthetic prescription-like pages (A4 at 150 dpi) rendered with Pillow"""
+    from PIL import Image, ImageDraw
+
+    lines = ["Rx: Metformin 500 mg - 1 tablet twice daily after meals",
+             "Amlodipine 5 mg - once daily in the morning",
+             "Atorvastatin 10 mg - at bedtime",
+             "Review HbA1c and lipid profile in 3 months"]
+    images = []
+    for number in range(pages):
+        image = Image.new("RGB", (width, height), "white")
+        draw = ImageDraw.Draw(image)
+        for row in range(40):
+            draw.text((80, 80 + row * 40), f"{number + 1}.{row + 1} {lines[row % len(lines)]}", fill="black")
+        images.append(image)
+    return images
+
+
+def _sample_document(pages=4):
+    """A PDF of synthetic prescription-like pages"""
+    import io
+
+    images = _sample_pages(pages)
+    buffer = io.BytesIO()
+    images[0].save(buffer, "PDF", save_all=True, append_images=images[1:], resolution=150)
+    return buffer.getvalue()
+
+
+def bench_ocr(pages=4, workers=None, n8n_latency=3.0, pretrained=False):
+    """Per-page latency of the local OCR engine (one worker vs the pool) and of the n8n path via the mock webhook.
+
+    pretrained=False times untrained doctr models, which cost the same to run, so no download is needed.
+    """
+    from mock_n8n import MockN8NServer
+    from ocr_engine import OCREngine, OCR_WORKERS
+    from webhook_client import WebhookClient
+
+    document = _sample_document(pages)
+    for count in sorted({1, workers or OCR_WORKERS}):
+        engine = OCREngine(workers=count, pretrained=pretrained)
+        engine.warm_up()
+        start = time.perf_counter()
+        engine.extract(document, "prescription.pdf")
+        elapsed = time.perf_counter() - start
+        engine.close()
+        print(f"local OCR, {count} worker(s): {elapsed * 1000:.0f} ms for {pages} pages, "
+              f"{elapsed / pages * 1000:.0f} ms per page")
+
+    server = MockN8NServer(upload_latency=n8n_latency).start()
+    client = WebhookClient(server.url)
+    try:
+        start = time.perf_counter()
+        client.upload_file("prescription.pdf", document, "application/pdf", [], "u1")
+        elapsed = time.perf_counter() - start
+        print(f"n8n path (mock answering after {n8n_latency:.1f} s): {elapsed * 1000:.0f} ms for {pages} pages, "
+              f"{elapsed / pages * 1000:.0f} ms per page")
+    finally:
+        client.close()
+        server.stop()
+
+
+def bench_annotation(blocks=300):
+    """Compare drawing OCR boxes one re-encode per block (the n8n Edit Image loop) with a single pass"""
+    import cv2
+    import numpy as np
+    from ocr_engine import annotate_page
+
+    page = np.asarray(_sample_pages(1)[0])
+    boxes = [{'text': f"word{i}", 'confidence': 90.0,
+              'bbox': {'x0': 80 + (i % 10) * 110, 'y0': 80 + (i // 10) * 40,
+                       'x1': 180 + (i % 10) * 110, 'y1': 100 + (i // 10) * 40}}
+             for i in range(blocks)]
+
+    def per_block_loop():
+        # Each iteration reads the image, draws blocks[0], writes it back and pops the block
+        encoded = cv2.imencode(".png", cv2.cvtColor(page, cv2.COLOR_RGB2BGR))[1].tobytes()
+        remaining = list(boxes)
+        while remaining:
+            image = cv2.imdecode(np.frombuffer(encoded, dtype=np.uint8), cv2.IMREAD_COLOR)
+            box = remaining[0]['bbox']
+            cv2.putText(image, f'"{remaining[0]["text"]}" ({remaining[0]["confidence"]:.0f}%)',
+                        (box['x0'], box['y0'] - 2), cv2.FONT_HERSHEY_SIMPLEX, 0.3, (0, 0, 255), 1, cv2.LINE_AA)
+            cv2.rectangle(image, (box['x0'], box['y0']), (box['x1'], box['y1']), (0, 0, 255), 1)
+            encoded = cv2.imencode(".png", image)[1].tobytes()
+            remaining = remaining[1:]
+        return encoded
+
+    loop = _time_per_call(per_block_loop, 1)
+    single = _time_per_call(lambda: annotate_page(page, boxes), 5)
+    print(f"annotating {blocks} boxes on a {page.shape[1]}x{page.shape[0]} page: per-block loop {loop * 1000:.0f} ms, "
+          f"single pass {single * 1000:.1f} ms ({loop / single:.0f}x)")
+
+
+OCR_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "fixtures", "ocr")
+
+
+def _ocr_fixtures(directory=OCR_FIXTURE_DIR):
+    """Checked-in phone photos of printed pages (sideways with an EXIF rotation, unevenly lit).
+
+    Returns (filename, bytes, ground truth text) tuples; each photo's text is in the .txt file of the same name.
+    """
+    fixtures = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".jpg"):
+            with open(os.path.join(directory, filename), "rb") as photo:
+                content = photo.read()
+            with open(os.path.join(directory, os.path.splitext(filename)[0] + ".txt"), encoding="utf-8") as truth:
+                fixtures.append((filename, content, truth.read()))
+    return fixtures
+
+
+def _edit_distance(reference, hypothesis):
+    """Levenshtein distance between two sequences (strings or lists of words)"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, expected in enumerate(reference, 1):
+        current = [i]
+        for j, actual in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (expected != actual)))
+        previous = current
+    return previous[-1]
+
+
+def _error_rates(truth, text):
+    """Character and word error rates of OCR text against the ground truth, whitespace normalized"""
+    truth_words, words = truth.split(), text.split()
+    cer = _edit_distance(" ".join(truth_words), " ".join(words)) / max(1, len(" ".join(truth_words)))
+    wer = _edit_distance(truth_words, words) / max(1, len(truth_words))
+    return cer, wer
+
+
+def bench_preprocessing(pretrained=False):
+    """Upload bytes, OCR latency and CER/WER on the checked-in photos before and after normalization.
+
+    Error rates are only meaningful with pretrained models.
+    """
+    from image_preprocessing import normalize_upload
+    from ocr_engine import OCREngine
+
+    fixtures = _ocr_fixtures()
+    engine = OCREngine(workers=1, pretrained=pretrained)
+    engine.warm_up()
+    totals = {'original': [0, 0.0, 0.0, 0.0], 'normalized': [0, 0.0, 0.0, 0.0]}
+    preprocessing = 0.0
+    try:
+        for filename, content, truth in fixtures:
+            start = time.perf_counter()
+            _, normalized, _ = normalize_upload(filename, content, "image/jpeg")
+            preprocessing += time.perf_counter() - start
+            for name, data in (('original', content), ('normalized', normalized)):
+                start = time.perf_counter()
+                text = engine.extract_text(data, filename)
+                cer, wer = _error_rates(truth, text)
+                totals[name][0] += len(data)
+                totals[name][1] += time.perf_counter() - start
+                totals[name][2] += cer
+                totals[name][3] += wer
+    finally:
+        engine.close()
+
+    count = len(fixtures)
+    print(f"preprocessing: {preprocessing / count * 1000:.0f} ms per photo ({count} photos)")
+    for name, (size, seconds, cer, wer) in totals.items():
+        note = "" if pretrained else " (untrained models)"
+        print(f"{name}: {size / count / 1e3:.0f} KB per upload, OCR {seconds / count * 1000:.0f} ms, "
+              f"CER {cer / count:.1%}, WER {wer / count:.1%}{note}")
+
+
+BENCHMARKS = {
+    'llm': bench_llm_construction,
+    'emotion': bench_emotion_classifier,
+    'mood': bench_mood_data,
+    'timeline': bench_mood_timeline,
+    'summary': bench_summary_prompt,
+    'page_load': bench_page_load,
+    'sqlite': bench_sqlite_backend,
+    'webhook': bench_webhook,
+    'upload_cache': bench_upload_cache,
+    'ocr': bench_ocr,
+    'annotation': bench_annotation,
+    'preprocessing': bench_preprocessing,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Swasthya AI micro-benchmarks")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -3,15 +3,22 @@
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_community.llms import Ollama
 import streamlit as st
-from database import SupabaseClient
 import time
+from database import get_db
+from llm_registry import get_llm, get_chain
+from streaming import stream_to_placeholder
+from prompt_builder import build_context, record_prompt_tokens
+from conversation_summary import get_summary_text, record_turn
+from response_cache import get_response_cache, needs_personal_context, has_relevant_context
+from persistence import save_chat_async
+
+CHAT_TURN_FIELDS = [("User", "question"), ("Assistant", "answer")]
 
 
 def initialize_llm():
-    """Initialize the language model"""
-    return Ollama(model="tinyllama")
+    """Return the shared language model"""
+    return get_llm("ollama", "tinyllama")
 
 
 def get_prompt_template():
@@ -26,9 +33,14 @@ def get_prompt_template():
     )
 
 
+def get_chat_chain():
+    """Return the shared prompt | llm | parser chain for the chatbot"""
+    return get_chain("chat", lambda: get_prompt_template() | initialize_llm() | StrOutputParser())
+
+
 def format_medical_conditions(user_id):
     """Get user's medical conditions as a formatted string"""
-    db = SupabaseClient()
+    db = get_db()
     medical_info = db.get_user_medical_info(user_id)
 
     if not medical_info:
@@ -38,23 +50,24 @@ def format_medical_conditions(user_id):
     return ", ".join(conditions)
 
 
-def get_conversation_context(conversation_history, max_context=5):
-    """Format the recent conversation history as context"""
-    if not conversation_history:
-        return "No previous context"
-
-    # Get last few interactions to use as context
-    recent_history = conversation_history[-max_context:]
-    context_text = ""
-
-    for entry in recent_history:
-        context_text += f"User: {entry['question']}\nAssistant: {entry['answer']}\n\n"
+def get_conversation_context(conversation_history, max_context=5, summary=None):
+    """Format the recent conversation history as context, within the prompt token budget.
 
+    A summary of older conversation, when there is one, is used as a compact prefix.
+    """
+    prefix = f"Summary of earlier conversation: {summary}" if summary else None
+    context_text, _ = build_context((conversation_history or [])[-max_context:], CHAT_TURN_FIELDS, prefix=prefix)
     return context_text
 
 
-def process_query(question, user_id):
-    """Process the user query and get a response from the language model"""
+def process_query(question, user_id, placeholder=None):
+    """Process the user query and get a response from the language model.
+
+    When a placeholder is given the response is streamed into it token by token. A general
+    question with no relevant past turns is answered from the response cache shared by users
+    with the same medical conditions; those answers are generated without the user's history.
+    Follow-ups and personal questions keep their conversation context and are never cached.
+    """
     # Initialize chat history in session state if not present
     if "chat_messages" not in st.session_state:
         st.session_state.chat_messages = []
@@ -62,26 +75,44 @@ def process_query(question, user_id):
     # Get user's medical conditions
     medical_conditions = format_medical_conditions(user_id)
 
-    # Get conversation context from session state
-    db = SupabaseClient()
-    conversation_history = db.get_chat_history(user_id)
-    conversation_context = get_conversation_context(conversation_history)
-
-    # Setup the language model chain
-    llm = initialize_llm()
-    prompt = get_prompt_template()
-    output_parser = StrOutputParser()
-    chain = prompt | llm | output_parser
+    # Get the past exchanges most relevant to this question; when none bear on it, it can be shared
+    db = get_db()
+    conversation_history = db.get_relevant_chat_history(user_id, question, limit=5)
+    cache = get_response_cache()
+    cacheable = not needs_personal_context(question) and not has_relevant_context(conversation_history)
+    response = cache.get(question, medical_conditions) if cacheable else None
+
+    if response is not None:
+        if placeholder is not None:
+            placeholder.markdown(response)
+    else:
+        if cacheable:
+            # Cached answers are shared by everyone with these conditions, so none of this user's history goes in
+            conversation_context = "None"
+        else:
+            conversation_context = get_conversation_context(conversation_history, summary=get_summary_text(user_id))
+
+        chain = get_chat_chain()
+
+        # Get response
+        inputs = {
+            "question": question,
+            "medical_conditions": medical_conditions,
+            "conversation_context": conversation_context
+        }
+        record_prompt_tokens("chat", get_prompt_template(), inputs)
+        started = time.perf_counter()
+        if placeholder is None:
+            response = chain.invoke(inputs)
+        else:
+            response = stream_to_placeholder(chain, inputs, placeholder, "chat")
 
-    # Get response
-    response = chain.invoke({
-        "question": question,
-        "medical_conditions": medical_conditions,
-        "conversation_context": conversation_context
-    })
+        if cacheable and response.strip():
+            cache.set(question, medical_conditions, response, time.perf_counter() - started)
 
-    # Save the chat to the database
-    db.save_chat(user_id, question, response)
+    # Queue the chat for saving in the background and fold older turns into the summary every few turns
+    save_chat_async(user_id, question, response)
+    record_turn(user_id)
 
     # Add to session state for immediate display
     st.session_state.chat_messages.append({"role": "user", "content": question})
@@ -108,19 +139,11 @@ def display_chat_interface():
         # Add user message to chat
         st.chat_message("user", avatar="👤").write(prompt)
 
-        # Show thinking animation
+        # Stream the response into the assistant message as it is generated
         with st.chat_message("assistant", avatar="🤖"):
-            thinking_placeholder = st.empty()
-            for i in range(3):
-                thinking_placeholder.write("Thinking" + "." * (i + 1))
-                time.sleep(0.3)
-
-            # Process the query
-            with st.spinner(""):
-                response = process_query(prompt, st.session_state['user_id'])
-
-            # Replace thinking animation with response
-            thinking_placeholder.write(response)
+            response_placeholder = st.empty()
+            response_placeholder.write("Thinking...")
+            process_query(prompt, st.session_state['user_id'], response_placeholder)
 
 
 def load_chat_history(user_id):
@@ -129,7 +152,7 @@ def load_chat_history(user_id):
         st.session_state.chat_messages = []
 
         # Get chat history from database
-        db = SupabaseClient()
+        db = get_db()
         chat_history = db.get_chat_history(user_id)
 
         if chat_history:
@@ -140,7 +163,7 @@ def load_chat_history(user_id):
 
 def display_chat_history(user_id):
     """Display the user's chat history as expandable sections"""
-    db = SupabaseClient()
+    db = get_db()
     chat_history = db.get_chat_history(user_id)
 
     if not chat_history:
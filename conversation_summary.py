@@ -0,0 +1,109 @@
+# conversation_summary.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from database import get_db
+from llm_registry import get_llm, get_chain
+from prompt_builder import build_context, truncate_to_tokens
+
+# Fold older turns into the summary once this many have piled up behind the recent window
+SUMMARY_EVERY_N_TURNS = int(os.getenv("SUMMARY_EVERY_N_TURNS", "5"))
+# The newest turns stay out of the summary; they reach the prompt verbatim
+SUMMARY_RECENT_TURNS = int(os.getenv("SUMMARY_RECENT_TURNS", "5"))
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "200"))
+# LLM calls one update may make; a longer backlog (a user's first summary) folds only its newest turns
+SUMMARY_MAX_BATCHES = int(os.getenv("SUMMARY_MAX_BATCHES", "4"))
+
+SUMMARY_TURN_FIELDS = [("User", "question"), ("Assistant", "answer")]
+
+# Summaries are written off the request path, one at a time
+_summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-summary")
+_lock = threading.Lock()
+_turns_since_update = {}
+_pending_users = set()
+
+
+def get_summary_prompt_template():
+    """Get the prompt template that folds new exchanges into the running summary"""
+    return ChatPromptTemplate.from_messages([
+        ("system", "You maintain a short running summary of a user's conversation with a health assistant. "
+                   "Keep the user's health concerns, symptoms, advice already given and anything they asked "
+                   "to be remembered. Drop small talk. Reply with the updated summary only, in at most "
+                   "{max_words} words."),
+        ("user", "Current summary: {summary}\n\nNew exchanges:\n{exchanges}")
+    ])
+
+
+def get_summary_chain():
+    """Return the shared chain used to update conversation summaries"""
+    return get_chain("summary", lambda: get_summary_prompt_template() | get_llm("ollama", "tinyllama")
+                     | StrOutputParser())
+
+
+def get_summary_text(user_id):
+    """Return the stored summary of the user's older conversation, or None"""
+    row = get_db().get_conversation_summary(user_id)
+    return row['summary'] if row and row.get('summary') else None
+
+
+def fold_into_summary(summary, turns):
+    """Ask the LLM to merge a batch of turns into the summary, capped at SUMMARY_MAX_TOKENS"""
+    exchanges, _ = build_context(turns, SUMMARY_TURN_FIELDS, budget=SUMMARY_MAX_TOKENS * 4)
+    updated = get_summary_chain().invoke({
+        "summary": summary or "None yet",
+        "exchanges": exchanges,
+        "max_words": SUMMARY_MAX_TOKENS * 3 // 4
+    })
+    return truncate_to_tokens(updated.strip(), SUMMARY_MAX_TOKENS)
+
+
+def update_summary(user_id, max_batches=SUMMARY_MAX_BATCHES):
+    """Fold the turns older than the recent window into the user's summary; returns turns folded.
+
+    At most max_batches LLM calls are made, on the newest of those turns, so a long backlog
+    cannot hold the single summary worker for every other user. Older turns beyond the cap
+    are skipped and the cursor moves past them anyway.
+    """
+    db = get_db()
+    row = db.get_conversation_summary(user_id) or {}
+    cursor = (row['last_created_at'], row['last_chat_id']) if row.get('last_chat_id') else None
+
+    turns = list(db.iter_chat_history(user_id, columns='question, answer', cursor=cursor))
+    pending = turns[:-SUMMARY_RECENT_TURNS] if SUMMARY_RECENT_TURNS else turns
+    if len(pending) < SUMMARY_EVERY_N_TURNS:
+        return 0
+
+    folded = pending[-max_batches * SUMMARY_EVERY_N_TURNS:]
+    summary = row.get('summary')
+    for start in range(0, len(folded), SUMMARY_EVERY_N_TURNS):
+        summary = fold_into_summary(summary, folded[start:start + SUMMARY_EVERY_N_TURNS])
+
+    last = pending[-1]
+    turns_summarized = row.get('turns_summarized', 0) + len(pending)
+    db.save_conversation_summary(user_id, summary, turns_summarized, (last['created_at'], last['id']))
+    return len(folded)
+
+
+def _run_update(user_id):
+    try:
+        update_summary(user_id)
+    except Exception as e:
+        print(f"Error updating conversation summary: {e}")
+    finally:
+        with _lock:
+            _pending_users.discard(user_id)
+
+
+def record_turn(user_id):
+    """Count a new chat turn and refresh the summary in the background every SUMMARY_EVERY_N_TURNS turns"""
+    with _lock:
+        _turns_since_update[user_id] = _turns_since_update.get(user_id, 0) + 1
+        if _turns_since_update[user_id] < SUMMARY_EVERY_N_TURNS or user_id in _pending_users:
+            return False
+        _turns_since_update[user_id] = 0
+        _pending_users.add(user_id)
+    _summary_executor.submit(_run_update, user_id)
+    return True
@@ -2,6 +2,7 @@
 
 import streamlit as st
 from mood_visualizations import create_dashboard_mood_summary
+from async_database import fetch_page_data
 
 # Enhanced CSS for professional and attractive design
 def add_hover_styles():
@@ -228,6 +229,14 @@ def display_dashboard():
     """Display the enhanced main dashboard with tiles for different features"""
     st.title(f"Welcome, {st.session_state['user_name']}!")
     add_hover_styles()
+
+    # The mood tile's reads are independent, so load them concurrently
+    user_id = st.session_state['user_id']
+    page_data = fetch_page_data('dashboard', {
+        'recent_entries': ('get_recent_emotional_diary_entries', (user_id, 10, 'mood, created_at'), None),
+        'rollups': ('get_mood_rollups', (user_id,), None),
+        'diary_count': ('count_emotional_diary_entries', (user_id,), None),
+    })
     
     # Enhanced Header with your logo
    
@@ -295,7 +304,8 @@ def display_dashboard():
         </div>
         """, unsafe_allow_html=True)
 
-        create_dashboard_mood_summary(st.session_state['user_id'])
+        create_dashboard_mood_summary(user_id, page_data['recent_entries'], page_data['rollups'],
+                                      page_data['diary_count'])
 
         # Analytics button with special styling
         st.markdown('<div class="analytics-button">', unsafe_allow_html=True)
@@ -0,0 +1,125 @@
+# embeddings.py
+
+import json
+import os
+import threading
+import time
+import numpy as np
+import metrics
+
+# Must match the dimension of the vector columns in Supabase (384 for MiniLM)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+# After the model fails to load, embeddings are skipped for this many seconds before loading is tried again
+EMBEDDING_RETRY_SECONDS = float(os.getenv("EMBEDDING_RETRY_SECONDS", "300"))
+
+
+class EmbedderUnavailable(RuntimeError):
+    """Raised instead of loading the model again while a recent load failure is cooling down"""
+
+
+class TextEmbedder:
+    """Mean-pooled, L2-normalized sentence embeddings computed on CPU"""
+
+    def __init__(self, model_name=EMBEDDING_MODEL, batch_size=EMBEDDING_BATCH_SIZE):
+        from transformers import AutoModel, AutoTokenizer
+
+        self.batch_size = batch_size
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name)
+        self.model.eval()
+
+    def embed(self, texts):
+        """Return one embedding (a list of floats) per text"""
+        import torch
+
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = self.tokenizer(texts[start:start + self.batch_size], padding=True, truncation=True,
+                                   max_length=256, return_tensors="pt")
+            with torch.no_grad():
+                hidden = self.model(**batch).last_hidden_state
+            mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            vectors.extend(torch.nn.functional.normalize(pooled, dim=1).tolist())
+        return vectors
+
+
+_lock = threading.Lock()
+_embedder = None
+_load_failed_at = None
+
+
+def get_embedder():
+    """Return the process-wide embedder, loading the model on first use.
+
+    A failed load is remembered: for EMBEDDING_RETRY_SECONDS afterwards this raises
+    EmbedderUnavailable at once, so callers skip embeddings instead of retrying the load.
+    """
+    global _embedder, _load_failed_at
+    with _lock:
+        if _embedder is None:
+            if _load_failed_at is not None and time.monotonic() - _load_failed_at < EMBEDDING_RETRY_SECONDS:
+                raise EmbedderUnavailable("embedding model failed to load recently")
+            try:
+                _embedder = TextEmbedder()
+            except Exception:
+                _load_failed_at = time.monotonic()
+                metrics.increment("embedding_load_failures")
+                raise
+            _load_failed_at = None
+        return _embedder
+
+
+def embed_texts(texts):
+    """Embed a batch of texts with the shared embedder"""
+    texts = [str(text or "") for text in texts]
+    return get_embedder().embed(texts) if texts else []
+
+
+def parse_vector(value):
+    """Turn a pgvector column value (a '[...]' string or a list) into a numpy array"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+class VectorIndex:
+    """In-memory cosine similarity index, the offline stand-in for pgvector search"""
+
+    def __init__(self):
+        self._vectors = []
+        self._rows = []
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, vector, row):
+        """Add one row under its embedding"""
+        vector = parse_vector(vector)
+        if vector is None:
+            return
+        norm = np.linalg.norm(vector)
+        with self._lock:
+            self._vectors.append(vector / norm if norm else vector)
+            self._rows.append(row)
+            self._matrix = None
+
+    def search(self, query_vector, k=5):
+        """Return up to k rows ordered by similarity to the query, each with a 'similarity' key"""
+        query = parse_vector(query_vector)
+        with self._lock:
+            if not self._rows or query is None:
+                return []
+            if self._matrix is None:
+                self._matrix = np.vstack(self._vectors)
+            matrix, rows = self._matrix, list(self._rows)
+
+        norm = np.linalg.norm(query)
+        scores = matrix @ (query / norm if norm else query)
+        top = np.argsort(-scores)[:k]
+        return [dict(rows[i], similarity=float(scores[i])) for i in top]
@@ -0,0 +1,78 @@
+# emotion_classifier.py
+
+import os
+import threading
+import time
+import metrics
+
+# The diary's emotion vocabulary, shared with the LLM prompt
+VALID_EMOTIONS = [
+    "happy", "sad", "angry", "anxious", "confused", "hopeful",
+    "grateful", "excited", "worried", "tired", "frustrated",
+    "overwhelmed", "calm", "peaceful", "content", "neutral",
+    "disappointed", "lonely", "proud", "stressed"
+]
+
+# "local" runs the transformers classifier first; "llm" skips it entirely
+EMOTION_BACKEND = os.getenv("EMOTION_BACKEND", "local")
+EMOTION_CLASSIFIER_MODEL = os.getenv("EMOTION_CLASSIFIER_MODEL", "typeform/distilbert-base-uncased-mnli")
+EMOTION_CONFIDENCE_THRESHOLD = float(os.getenv("EMOTION_CONFIDENCE_THRESHOLD", "0.25"))
+EMOTION_BATCH_SIZE = int(os.getenv("EMOTION_BATCH_SIZE", "16"))
+# After the model fails to load, entries go straight to the LLM for this many seconds before loading is tried again
+EMOTION_CLASSIFIER_RETRY_SECONDS = float(os.getenv("EMOTION_CLASSIFIER_RETRY_SECONDS", "300"))
+
+
+class ClassifierUnavailable(RuntimeError):
+    """Raised instead of loading the model again while a recent load failure is cooling down"""
+
+
+class LocalEmotionClassifier:
+    """Zero-shot NLI classifier over VALID_EMOTIONS that runs on CPU"""
+
+    def __init__(self, model_name=EMOTION_CLASSIFIER_MODEL, labels=VALID_EMOTIONS, batch_size=EMOTION_BATCH_SIZE):
+        from transformers import pipeline
+
+        self.labels = list(labels)
+        self.batch_size = batch_size
+        self.pipeline = pipeline("zero-shot-classification", model=model_name, device=-1)
+
+    def classify(self, texts):
+        """Return a (label, confidence) pair for each text"""
+        texts = list(texts)
+        if not texts:
+            return []
+        results = self.pipeline(
+            texts,
+            candidate_labels=self.labels,
+            hypothesis_template="The writer feels {}.",
+            batch_size=self.batch_size
+        )
+        if isinstance(results, dict):
+            results = [results]
+        return [(result['labels'][0], result['scores'][0]) for result in results]
+
+
+_lock = threading.Lock()
+_classifier = None
+_load_failed_at = None
+
+
+def get_local_classifier():
+    """Return the process-wide classifier, loading the model on first use.
+
+    A failed load is remembered: for EMOTION_CLASSIFIER_RETRY_SECONDS afterwards this raises
+    ClassifierUnavailable at once, so entries fall back to the LLM instead of retrying the load.
+    """
+    global _classifier, _load_failed_at
+    with _lock:
+        if _classifier is None:
+            if _load_failed_at is not None and time.monotonic() - _load_failed_at < EMOTION_CLASSIFIER_RETRY_SECONDS:
+                raise ClassifierUnavailable("emotion classifier failed to load recently")
+            try:
+                _classifier = LocalEmotionClassifier()
+            except Exception:
+                _load_failed_at = time.monotonic()
+                metrics.increment("emotion_classifier_load_failures")
+                raise
+            _load_failed_at = None
+        return _classifier
@@ -3,20 +3,34 @@
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_community.llms import Ollama
 import streamlit as st
-from database import SupabaseClient
+from database import get_db
+from llm_registry import get_llm, get_chain
+from emotion_classifier import (VALID_EMOTIONS, EMOTION_BACKEND, EMOTION_CONFIDENCE_THRESHOLD,
+                                get_local_classifier)
+from mood_visualizations import extract_mood_from_entry
+from streaming import stream_to_placeholder
+from prompt_builder import build_context, record_prompt_tokens
+from persistence import save_emotional_diary_entry_async
+from concurrent.futures import ThreadPoolExecutor
+import os
 import time
 import json
-from langchain_groq import ChatGroq
 
 api_key="groqApi"
 
+# Combined time budget for the diary response and its emotion classification
+DIARY_DEADLINE_SECONDS = float(os.getenv("DIARY_DEADLINE_SECONDS", "20"))
+
+DIARY_TURN_FIELDS = [("User entry", "entry"), ("Assistant response", "response")]
+
+# Emotion classification runs here while the response is being generated
+_emotion_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="diary-emotion")
+
 
 def initialize_llm():
-    """Initialize the language model"""
-    model=ChatGroq(api_key=api_key,model="llama-3.1-8b-instant",max_tokens=200)
-    return model
+    """Return the shared language model"""
+    return get_llm("groq", "llama-3.1-8b-instant", api_key=api_key, max_tokens=200)
 
 
 def get_prompt_template():
@@ -34,18 +48,14 @@ def get_prompt_template():
     )
 
 
-def analyze_emotion(entry):
-    """Analyze the emotion in the diary entry with improved prompting"""
-    # Define our valid emotions
-    valid_emotions = {
-        "happy", "sad", "angry", "anxious", "confused", "hopeful",
-        "grateful", "excited", "worried", "tired", "frustrated",
-        "overwhelmed", "calm", "peaceful", "content", "neutral",
-        "disappointed", "lonely", "proud", "stressed"
-    }
-    
-    llm = initialize_llm()
-    prompt = ChatPromptTemplate.from_messages([
+def get_diary_chain():
+    """Return the shared prompt | llm | parser chain for diary responses"""
+    return get_chain("diary", lambda: get_prompt_template() | initialize_llm() | StrOutputParser())
+
+
+def get_emotion_prompt_template():
+    """Get the prompt template for single-word emotion detection"""
+    return ChatPromptTemplate.from_messages([
         ("system", """You are an emotion detection AI. Analyze the text and identify the SINGLE strongest emotion.
           
           STRICTLY respond with ONLY ONE WORD from this list:
@@ -62,75 +72,118 @@ def analyze_emotion(entry):
           
           If no strong emotion is present, respond with 'neutral'.
           """),
-        ("user", f"Text to analyze: {entry}")
+        ("user", "Text to analyze: {entry}")
     ])
+
+
+def get_emotion_chain():
+    """Return the shared chain used to classify a diary entry's emotion"""
+    return get_chain("emotion", lambda: get_emotion_prompt_template() | initialize_llm() | StrOutputParser())
+
+
+def classify_emotion_llm(entry):
+    """Classify the diary entry's emotion with the LLM, raising on failure"""
+    valid_emotions = set(VALID_EMOTIONS)
+    
+    llm = initialize_llm()
+    emotion_chain = get_emotion_chain()
     
-    emotion_chain = prompt | llm | StrOutputParser()
+    emotion = emotion_chain.invoke({"entry": entry})
+    emotion = emotion.strip().lower()
     
-    try:
-        emotion = emotion_chain.invoke({})
-        emotion = emotion.strip().lower()
-        
-        # Extract first word and remove any punctuation
-        emotion = emotion.split()[0] if emotion else "neutral"
+    # Extract first word and remove any punctuation
+    emotion = emotion.split()[0] if emotion else "neutral"
+    emotion = emotion.rstrip('.,!?;:')
+    
+    # Validate the emotion
+    if emotion not in valid_emotions:
+        # Try a second time with a simpler prompt if first attempt fails
+        emotion = llm.invoke(f"Select one word emotion from {valid_emotions} for this text: {entry}")
+        emotion = emotion.strip().lower().split()[0]
         emotion = emotion.rstrip('.,!?;:')
         
-        # Validate the emotion
-        if emotion not in valid_emotions:
-            # Try a second time with a simpler prompt if first attempt fails
-            emotion = llm.invoke(f"Select one word emotion from {valid_emotions} for this text: {entry}")
-            emotion = emotion.strip().lower().split()[0]
-            emotion = emotion.rstrip('.,!?;:')
-            
-            return emotion if emotion in valid_emotions else "neutral"
-            
-        return emotion
+        return emotion if emotion in valid_emotions else "neutral"
         
+    return emotion
+
+
+def classify_emotions(entries):
+    """Classify a batch of entries, asking the LLM only for low-confidence local results"""
+    entries = list(entries)
+    local_results = [(None, 0.0)] * len(entries)
+    if EMOTION_BACKEND == "local":
+        try:
+            local_results = get_local_classifier().classify(entries)
+        except Exception as e:
+            print(f"Local emotion classifier unavailable: {e}")
+
+    return [label if label and confidence >= EMOTION_CONFIDENCE_THRESHOLD else classify_emotion_llm(entry)
+            for entry, (label, confidence) in zip(entries, local_results)]
+
+
+def classify_emotion(entry):
+    """Classify the diary entry's emotion, raising on failure"""
+    return classify_emotions([entry])[0]
+
+
+def analyze_emotion(entry):
+    """Analyze the emotion in the diary entry with improved prompting"""
+    try:
+        return classify_emotion(entry)
     except Exception as e:
         print(f"Error analyzing emotion: {e}")
         return "neutral"
 
 
-def get_conversation_context(conversation_history, max_context=3):
-    """Format the recent conversation history as context"""
-    if not conversation_history:
-        return "No previous context"
-
-    # Get last few interactions to use as context
-    recent_history = conversation_history[-max_context:]
-    context_text = ""
+def resolve_emotion(entry, emotion_future, timeout):
+    """Wait up to timeout seconds for the LLM emotion, else fall back to keyword matching"""
+    try:
+        return emotion_future.result(timeout=max(timeout, 0))
+    except Exception as e:
+        print(f"Emotion classification fell back to keywords: {e!r}")
+        emotion_future.cancel()
+        return extract_mood_from_entry({'entry': entry})
 
-    for entry in recent_history:
-        context_text += f"User entry: {entry['entry']}\nAssistant response: {entry['response']}\n\n"
 
+def get_conversation_context(conversation_history, max_context=3):
+    """Format the recent conversation history as context, within the prompt token budget"""
+    context_text, _ = build_context((conversation_history or [])[-max_context:], DIARY_TURN_FIELDS)
     return context_text
 
 
-def process_diary_entry(entry, user_id):
-    """Process the diary entry and get a response from the language model"""
+def process_diary_entry(entry, user_id, placeholder=None):
+    """Process the diary entry and get a response from the language model.
+
+    When a placeholder is given the response is streamed into it token by token.
+    """
     # Initialize diary history in session state if not present
     if "diary_messages" not in st.session_state:
         st.session_state.diary_messages = []
 
-    # Get conversation context from database
-    db = SupabaseClient()
-    conversation_history = db.get_emotional_diary_history(user_id)
+    # Classify the emotion concurrently, since it depends only on the entry text
+    started = time.monotonic()
+    emotion_future = _emotion_executor.submit(classify_emotion, entry)
+
+    # Get the most relevant past entries as context
+    db = get_db()
+    conversation_history = db.get_relevant_emotional_diary_entries(user_id, entry, limit=3)
     conversation_context = get_conversation_context(conversation_history)
 
-    # Setup the language model chain
-    llm = initialize_llm()
-    prompt = get_prompt_template()
-    output_parser = StrOutputParser()
-    chain = prompt | llm | output_parser
+    chain = get_diary_chain()
 
     # Get response
-    response = chain.invoke({
+    inputs = {
         "entry": entry,
         "conversation_context": conversation_context
-    })
+    }
+    record_prompt_tokens("diary", get_prompt_template(), inputs)
+    if placeholder is None:
+        response = chain.invoke(inputs)
+    else:
+        response = stream_to_placeholder(chain, inputs, placeholder, "diary")
     
-    # Analyze the emotion in the entry
-    mood = analyze_emotion(entry)
+    # Collect the emotion within whatever is left of the combined deadline
+    mood = resolve_emotion(entry, emotion_future, DIARY_DEADLINE_SECONDS - (time.monotonic() - started))
     
     # Create JSON data (includes both entry and response)
     json_data = {
@@ -140,8 +193,8 @@ def process_diary_entry(entry, user_id):
         "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
     }
 
-    # Save the diary entry to the database
-    db.save_emotional_diary_entry(user_id, entry, response, mood, json.dumps(json_data))
+    # Queue the diary entry for saving in the background
+    save_emotional_diary_entry_async(user_id, entry, response, mood, json.dumps(json_data))
 
     # Add to session state for immediate display
     st.session_state.diary_messages.append({"role": "user", "content": entry})
@@ -168,19 +221,11 @@ def display_diary_interface():
         # Add user message to chat
         st.chat_message("user", avatar="📝").write(entry)
 
-        # Show thinking animation
+        # Stream the response into the assistant message as it is generated
         with st.chat_message("assistant", avatar="🧠"):
-            thinking_placeholder = st.empty()
-            for i in range(3):
-                thinking_placeholder.write("Thinking" + "." * (i + 1))
-                time.sleep(0.3)
-
-            # Process the entry
-            with st.spinner(""):
-                response, mood = process_diary_entry(entry, st.session_state['user_id'])
-
-            # Replace thinking animation with response
-            thinking_placeholder.write(response)
+            response_placeholder = st.empty()
+            response_placeholder.write("Thinking...")
+            process_diary_entry(entry, st.session_state['user_id'], response_placeholder)
 
 
 def load_diary_history(user_id):
@@ -189,7 +234,7 @@ def load_diary_history(user_id):
         st.session_state.diary_messages = []
 
         # Get diary history from database
-        db = SupabaseClient()
+        db = get_db()
         diary_history = db.get_emotional_diary_history(user_id)
 
         if diary_history:
@@ -200,7 +245,7 @@ def load_diary_history(user_id):
 
 def display_diary_history(user_id):
     """Display the user's diary history as expandable sections"""
-    db = SupabaseClient()
+    db = get_db()
     diary_history = db.get_emotional_diary_history(user_id)
 
     if not diary_history:
@@ -0,0 +1,279 @@
+# fault_injection.py
+
+import argparse
+import itertools
+import time
+from postgrest.exceptions import APIError
+import database
+from database import SupabaseClient, CircuitBreaker, UserCache, DatabaseReadError
+
+
+class FaultInjector:
+    """Decides, call by call, whether the stand-in backend answers, fails or hangs"""
+
+    def __init__(self):
+        self.calls = 0
+        self.mode = 'ok'
+        self.failures_left = 0
+        self.rejections_left = 0
+        self.hang_seconds = 0.0
+        self.latency = 0.0
+
+    def fail_next(self, count):
+        """Fail the next count calls, then recover"""
+        self.failures_left = count
+
+    def reject_next(self, count):
+        """Answer the next count calls with a 4xx-style error, as PostgREST does for a bad request"""
+        self.rejections_left = count
+
+    def before_call(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.rejections_left:
+            self.rejections_left -= 1
+            raise APIError({'code': '23502', 'message': 'null value in column "answer" violates not-null constraint'})
+        if self.failures_left:
+            self.failures_left -= 1
+            raise ConnectionError("injected transient failure")
+        if self.mode == 'down':
+            raise ConnectionError("injected outage")
+        if self.mode == 'hang':
+            time.sleep(self.hang_seconds)
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    """Enough of the postgrest query builder for SupabaseClient's simple filters"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, backend, table):
+        self.backend = backend
+        self.table = table
+        self.action = 'select'
+        self.payload = None
+        self.filters = []
+        self.order_by = []
+        self.row_limit = None
+
+    def select(self, columns='*'):
+        self.action = 'select'
+        return self
+
+    def insert(self, rows):
+        self.action, self.payload = 'insert', rows
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False):
+        self.action, self.payload = 'insert', rows
+        return self
+
+    def update(self, data):
+        self.action, self.payload = 'update', data
+        return self
+
+    def delete(self):
+        self.action = 'delete'
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: str(row.get(column)) >= str(value))
+        return self
+
+    def order(self, column, desc=False):
+        self.order_by.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def execute(self):
+        self.backend.injector.before_call()
+        rows = self.backend.tables.setdefault(self.table, [])
+        matched = [row for row in rows if all(f(row) for f in self.filters)]
+
+        if self.action == 'insert':
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            added = [dict(row, id=row.get('id') or next(self._ids)) for row in payload]
+            rows.extend(added)
+            return FakeResponse(added)
+        if self.action == 'update':
+            for row in matched:
+                row.update(self.payload)
+            return FakeResponse(matched)
+        if self.action == 'delete':
+            self.backend.tables[self.table] = [row for row in rows if row not in matched]
+            return FakeResponse(matched)
+
+        for column, desc in reversed(self.order_by):
+            matched.sort(key=lambda row: str(row.get(column)), reverse=desc)
+        return FakeResponse([dict(row) for row in matched[:self.row_limit]])
+
+
+class FakeSupabase:
+    """In-memory stand-in for a Supabase client, with every call going through an injector"""
+
+    def __init__(self, injector):
+        self.injector = injector
+        self.tables = {}
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        raise NotImplementedError(f"stand-in has no {name} function")
+
+
+class FakePool:
+    """Pool interface of SupabaseClientPool around a single stand-in client"""
+
+    size = 2
+
+    def __init__(self, client):
+        self.client = client
+
+    def acquire(self):
+        return self.client
+
+    def stats(self):
+        return {'size': self.size, 'open': 1, 'opened': 1, 'reused': 0}
+
+
+def make_client(failure_threshold=3, reset_seconds=0.5):
+    """Return a SupabaseClient over the stand-in backend, plus the backend's injector"""
+    injector = FaultInjector()
+    backend = FakeSupabase(injector)
+    backend.tables['users1'] = [{'id': 'u1', 'email': 'asha@example.com', 'full_name': 'Asha'}]
+    backend.tables['chat_history'] = [
+        {'id': 'c1', 'user_id': 'u1', 'question': 'Diet for diabetes?', 'answer': 'Fibre, fewer sugars.',
+         'created_at': '2025-01-01T10:00:00+00:00'}
+    ]
+    db = SupabaseClient(FakePool(backend), UserCache(ttl=0), CircuitBreaker(failure_threshold, reset_seconds))
+    return db, injector
+
+
+def scenario_transient_read_is_retried():
+    db, injector = make_client()
+    injector.fail_next(1)
+    user = db.get_user_by_id('u1')
+    return user is not None and injector.calls == 2 and not db.errors, f"calls={injector.calls}"
+
+
+def scenario_outage_serves_last_good():
+    db, injector = make_client()
+    primed = db.get_chat_history('u1')
+    injector.mode = 'down'
+    results = [db.get_chat_history('u1') for _ in range(3)]
+    calls_when_open = injector.calls
+    db.get_chat_history('u1')
+    passed = (all(result == primed for result in results) and db.breaker.state == 'open'
+              and db.last_error['served_stale'] and injector.calls == calls_when_open)
+    return passed, f"breaker={db.breaker.state}, last_error={db.last_error}"
+
+
+def scenario_failure_with_closed_breaker_returns_default():
+    db, injector = make_client(failure_threshold=10)
+    db.get_chat_history('u1')
+    injector.mode = 'down'
+    history = db.get_chat_history('u1')
+    passed = history == [] and db.breaker.state == 'closed' and not db.last_error['served_stale']
+    return passed, f"breaker={db.breaker.state}, last_error={db.last_error}"
+
+
+def scenario_outage_without_cache_returns_default():
+    db, injector = make_client()
+    injector.mode = 'down'
+    history = db.get_emotional_diary_history('u1')
+    return history == [] and db.last_error['error_type'] == 'ConnectionError', f"last_error={db.last_error}"
+
+
+def scenario_hang_times_out():
+    db, injector = make_client()
+    injector.mode, injector.hang_seconds = 'hang', 2.0
+    started = time.monotonic()
+    user = db.get_user_by_id('u1')
+    elapsed = time.monotonic() - started
+    passed = user is None and elapsed < 1.5 and db.last_error['error_type'] == 'OperationTimeout'
+    return passed, f"elapsed={elapsed:.2f}s, last_error={db.last_error}"
+
+
+def scenario_failed_login_lookup_raises():
+    db, injector = make_client()
+    db.get_user_by_email('asha@example.com')
+    injector.mode = 'down'
+    try:
+        db.get_user_by_email('asha@example.com')
+    except DatabaseReadError as e:
+        return e.operation == 'get_user_by_email', f"raised {e}"
+    return False, "failed lookup was returned as a result"
+
+
+def scenario_breaker_recovers():
+    db, injector = make_client(reset_seconds=0.2)
+    injector.mode = 'down'
+    db.get_chat_history('u1')
+    opened = db.breaker.state == 'open'
+    injector.mode = 'ok'
+    time.sleep(0.25)
+    history = db.get_chat_history('u1')
+    return opened and history and db.breaker.state == 'closed', f"breaker={db.breaker.stats()}"
+
+
+def scenario_rejected_requests_do_not_open_breaker():
+    db, injector = make_client(failure_threshold=2)
+    injector.reject_next(5)
+    for _ in range(5):
+        db.update_user('u1', {'full_name': None})
+    user = db.get_user_by_id('u1')
+    passed = (user is not None and db.breaker.state == 'closed' and injector.calls == 6
+              and db.errors[-1]['error_kind'] == 'permanent')
+    return passed, f"breaker={db.breaker.stats()}, calls={injector.calls}"
+
+
+def scenario_write_is_not_retried():
+    db, injector = make_client()
+    injector.fail_next(1)
+    updated = db.update_user('u1', {'full_name': 'Asha R'})
+    return not updated and injector.calls == 1, f"calls={injector.calls}"
+
+
+SCENARIOS = {
+    'transient_read': scenario_transient_read_is_retried,
+    'outage_last_good': scenario_outage_serves_last_good,
+    'closed_breaker_default': scenario_failure_with_closed_breaker_returns_default,
+    'outage_no_cache': scenario_outage_without_cache_returns_default,
+    'hang_timeout': scenario_hang_times_out,
+    'strict_lookup': scenario_failed_login_lookup_raises,
+    'breaker_recovery': scenario_breaker_recovers,
+    'rejected_requests': scenario_rejected_requests_do_not_open_breaker,
+    'write_not_retried': scenario_write_is_not_retried,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run SupabaseClient resilience scenarios against a faulty stand-in")
+    parser.add_argument("names", nargs="*", help=f"scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    args = parser.parse_args()
+
+    # Short deadlines keep the scenarios fast
+    database.DB_READ_TIMEOUT = 0.5
+    database.DB_WRITE_TIMEOUT = 0.5
+    database.DB_RETRY_DELAY = 0.01
+
+    failed = 0
+    for name in args.names or SCENARIOS:
+        passed, detail = SCENARIOS[name]()
+        failed += not passed
+        print(f"{'PASS' if passed else 'FAIL'} {name}: {detail}")
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,99 @@
+# image_preprocessing.py
+
+import io
+import os
+import re
+import numpy as np
+import metrics
+
+# Set to 0 to send uploads exactly as the user picked them
+PREPROCESS_UPLOADS = os.getenv("PREPROCESS_UPLOADS", "1") == "1"
+# OCR engines are tuned for about 300 dpi; phone photos of a page are usually far above that
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+# Short side of an A4 page, used to turn a dpi into a pixel size for photos without one
+PAGE_SHORT_SIDE_INCHES = 8.27
+
+PROFILES = {
+    # Handwriting: a threshold breaks up thin pen strokes, so keep the grey levels
+    'prescription': {'grayscale': True, 'threshold': False, 'dpi': OCR_TARGET_DPI, 'format': 'JPEG', 'quality': 80},
+    # Printed lab reports and discharge summaries binarize cleanly and compress well as PNG
+    'report': {'grayscale': True, 'threshold': True, 'block_size': 31, 'offset': 15, 'dpi': OCR_TARGET_DPI,
+               'format': 'PNG'},
+    'default': {'grayscale': True, 'threshold': False, 'dpi': OCR_TARGET_DPI, 'format': 'JPEG', 'quality': 85},
+}
+
+# Same naming rule the n8n workflow uses to send prescriptions down the Tesseract branch.
+# Report words must stand alone ("lab_results.jpg", not "label.jpg" or "syllabus.jpg"); only letters join
+# words, since \b would treat the "_" in file names as part of a word.
+DOCUMENT_TYPE_PATTERNS = [
+    ('prescription', re.compile(r"^prescription", re.IGNORECASE)),
+    ('report', re.compile(r"(?<![a-z])(reports?|labs?|results?|discharge|summary|summaries)(?![a-z])",
+                          re.IGNORECASE)),
+]
+
+FORMAT_TYPES = {'JPEG': ('image/jpeg', '.jpg'), 'PNG': ('image/png', '.png')}
+
+
+def document_type(filename):
+    """Pick the preprocessing profile name for an upload from its file name"""
+    for name, pattern in DOCUMENT_TYPE_PATTERNS:
+        if pattern.search(os.path.basename(str(filename or ""))):
+            return name
+    return 'default'
+
+
+def normalize_image(content, profile):
+    """Rotate by EXIF, convert to grayscale, threshold, resize to the profile's dpi and re-encode.
+
+    Returns the encoded bytes and the PIL format name.
+    """
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(content)))
+    image = image.convert('L' if profile['grayscale'] or profile['threshold'] else 'RGB')
+
+    target = round(profile['dpi'] * PAGE_SHORT_SIDE_INCHES)
+    scale = target / min(image.size)
+    if scale < 1:
+        image = image.resize((round(image.width * scale), round(image.height * scale)), Image.LANCZOS)
+
+    if profile['threshold']:
+        import cv2
+        binary = cv2.adaptiveThreshold(np.asarray(image), 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+                                       profile['block_size'], profile['offset'])
+        image = Image.fromarray(binary)
+
+    buffer = io.BytesIO()
+    if profile['format'] == 'JPEG':
+        image.save(buffer, 'JPEG', quality=profile['quality'], optimize=True)
+    else:
+        image.save(buffer, profile['format'], optimize=True)
+    return buffer.getvalue(), profile['format']
+
+
+def normalize_upload(filename, content, content_type, profile=None):
+    """Shrink an uploaded image for OCR; returns (filename, content, content_type).
+
+    Called from the upload job's worker thread, never the Streamlit script. PDFs, other
+    files and images that would not get smaller are returned unchanged.
+    """
+    if not PREPROCESS_UPLOADS or not str(content_type or "").startswith("image/"):
+        return filename, content, content_type
+
+    profile = profile or PROFILES[document_type(filename)]
+    try:
+        with metrics.timer("image_preprocessing"):
+            normalized, image_format = normalize_image(content, profile)
+    except Exception as e:
+        print(f"Error preprocessing {filename}, uploading it unchanged: {e}")
+        metrics.increment("image_preprocessing_errors")
+        return filename, content, content_type
+
+    metrics.observe("upload_bytes_original", len(content))
+    if len(normalized) >= len(content):
+        metrics.observe("upload_bytes_sent", len(content))
+        return filename, content, content_type
+
+    metrics.observe("upload_bytes_sent", len(normalized))
+    new_type, extension = FORMAT_TYPES[image_format]
+    return os.path.splitext(filename)[0] + extension, normalized, new_type
@@ -0,0 +1,62 @@
+# llm_registry.py
+
+import threading
+
+_lock = threading.Lock()
+_models = {}
+_chains = {}
+_warmed_up = False
+
+
+def _build_llm(provider, model, **params):
+    """Construct a LangChain model for the given provider"""
+    if provider == "ollama":
+        from langchain_community.llms import Ollama
+        return Ollama(model=model, **params)
+    if provider == "groq":
+        from langchain_groq import ChatGroq
+        return ChatGroq(model=model, **params)
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+def get_llm(provider, model, **params):
+    """Return the process-wide model for (provider, model, params), building it on first use"""
+    key = (provider, model, tuple(sorted(params.items())))
+    with _lock:
+        if key not in _models:
+            _models[key] = _build_llm(provider, model, **params)
+        return _models[key]
+
+
+def get_chain(name, factory):
+    """Return the process-wide chain registered under name, building it with factory() on first use"""
+    with _lock:
+        chain = _chains.get(name)
+    if chain is None:
+        # Build outside the lock: factories call get_llm, which takes it again
+        chain = factory()
+        with _lock:
+            chain = _chains.setdefault(name, chain)
+    return chain
+
+
+def warm_up(chain_getters):
+    """Build every chain once per process so the first request does not pay for it"""
+    global _warmed_up
+    if _warmed_up:
+        return
+    for getter in chain_getters:
+        try:
+            getter()
+        except Exception as e:
+            print(f"Error warming up LLM chain: {e}")
+    _warmed_up = True
+
+
+def clear():
+    """Drop all cached models and chains"""
+    global _warmed_up
+    with _lock:
+        _models.clear()
+        _chains.clear()
+        _warmed_up = False
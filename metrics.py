@@ -0,0 +1,62 @@
+# metrics.py
+
+import threading
+import time
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_counters = {}
+_timings = {}
+
+
+def increment(name, value=1):
+    """Add value to a named counter"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def get_counter(name):
+    """Return the current value of a named counter"""
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def observe(name, value):
+    """Record one measurement (a duration, a size, ...) for a named series"""
+    with _lock:
+        stats = _timings.setdefault(name, {'count': 0, 'total': 0.0, 'last': 0.0, 'max': 0.0})
+        stats['count'] += 1
+        stats['total'] += value
+        stats['last'] = value
+        stats['max'] = max(stats['max'], value)
+
+
+def record_timing(name, seconds):
+    """Record one duration (in seconds) for a named operation"""
+    observe(name, seconds)
+
+
+@contextmanager
+def timer(name):
+    """Time the wrapped block and record it under name"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, time.perf_counter() - start)
+
+
+def snapshot():
+    """Return a copy of all counters and timing summaries"""
+    with _lock:
+        timings = {}
+        for name, stats in _timings.items():
+            timings[name] = dict(stats, avg=stats['total'] / stats['count'] if stats['count'] else 0.0)
+        return {'counters': dict(_counters), 'timings': timings}
+
+
+def reset():
+    """Clear all counters and timings"""
+    with _lock:
+        _counters.clear()
+        _timings.clear()
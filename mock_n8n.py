@@ -0,0 +1,109 @@
+# mock_n8n.py
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockN8NHandler(BaseHTTPRequestHandler):
+    """Answers the two webhook calls the app makes: JSON chat prompts and multipart uploads"""
+
+    # Keep-alive, like n8n behind its reverse proxy, so connection reuse shows up in the counters
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this, delayed ACKs stall every reused connection
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.server.count('requests')
+        content_type = self.headers.get('Content-Type', '')
+
+        if content_type.startswith('application/json'):
+            time.sleep(self.server.chat_latency)
+            prompt = json.loads(body or b'{}').get('chatInput', '')
+            text = f"Mock answer to: {prompt}"
+        elif content_type.startswith('multipart/form-data'):
+            time.sleep(self.server.upload_latency)
+            match = re.search(rb'filename="([^"]*)"', body)
+            filename = match.group(1).decode('utf-8', 'replace') if match else 'unknown'
+            text = f"Mock extraction of {filename} ({len(body)} bytes received)"
+        else:
+            text = f"Unsupported content type: {content_type}"
+            self._reply(400, text)
+            return
+        self._reply(self.server.status_code, text)
+
+    def _reply(self, status, text):
+        payload = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockN8NServer(ThreadingHTTPServer):
+    """Local stand-in for the n8n webhook with configurable latency and status code"""
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, chat_latency=0.05, upload_latency=0.5, status_code=200):
+        super().__init__((host, port), MockN8NHandler)
+        self.chat_latency = chat_latency
+        self.upload_latency = upload_latency
+        self.status_code = status_code
+        self.counters = {'connections': 0, 'requests': 0}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/webhook"
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def handle_error(self, request, client_address):
+        # A client that timed out and hung up is expected here, not an error worth a traceback
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def start(self):
+        """Serve from a background thread and return self"""
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-n8n", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock of the n8n webhook")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5678)
+    parser.add_argument("--chat-latency", type=float, default=0.05, help="seconds before answering a prompt")
+    parser.add_argument("--upload-latency", type=float, default=0.5, help="seconds before answering an upload")
+    parser.add_argument("--status", type=int, default=200, help="status code to answer with")
+    args = parser.parse_args()
+
+    server = MockN8NServer(args.host, args.port, args.chat_latency, args.upload_latency, args.status)
+    print(f"Mock n8n webhook listening on {server.url} (set N8N_WEBHOOK_URL to this)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,130 @@
+# mood_rollups.py
+
+import argparse
+from datetime import datetime
+
+# Enhanced mood values with more granular scoring
+MOOD_VALUES = {
+    # Very positive (5)
+    "excited": 5, "thrilled": 5, "ecstatic": 5, "elated": 5, "joyful": 5, "euphoric": 5,
+
+    # Positive (4)
+    "happy": 4, "cheerful": 4, "delighted": 4, "glad": 4, "content": 4,
+    "grateful": 4, "thankful": 4, "blessed": 4, "peaceful": 4, "proud": 4,
+
+    # Neutral/Calm (3)
+    "calm": 3, "neutral": 3, "relaxed": 3, "tranquil": 3, "composed": 3,
+    "reflective": 3, "thoughtful": 3, "okay": 3, "fine": 3,
+
+    # Slightly negative (2)
+    "confused": 2, "uncertain": 2, "worried": 2, "concerned": 2, "uneasy": 2,
+    "tired": 2, "weary": 2, "drained": 2, "restless": 2, "bored": 2,
+
+    # Negative (1)
+    "anxious": 1, "stressed": 1, "overwhelmed": 1, "sad": 1, "down": 1,
+    "angry": 1, "frustrated": 1, "annoyed": 1, "lonely": 1, "isolated": 1,
+    "disappointed": 1, "discouraged": 1, "depressed": 1, "furious": 1
+}
+
+TIME_BUCKETS = ['Morning', 'Afternoon', 'Evening', 'Night']
+
+
+def get_time_bucket(hour):
+    """Map an hour of the day to the heatmap's time-of-day bucket"""
+    if 5 <= hour < 12:
+        return 'Morning'
+    elif 12 <= hour < 17:
+        return 'Afternoon'
+    elif 17 <= hour < 21:
+        return 'Evening'
+    else:
+        return 'Night'
+
+
+def normalize_mood(mood):
+    """Lower-case a stored mood, treating empty values as neutral"""
+    mood = str(mood or '').lower().strip()
+    return mood if mood and mood != 'none' else 'neutral'
+
+
+def parse_created_at(created_at):
+    """Parse a Supabase timestamp into a naive datetime in its stored wall-clock time"""
+    if isinstance(created_at, datetime):
+        return created_at.replace(tzinfo=None)
+    return datetime.fromisoformat(str(created_at).replace('Z', '+00:00')).replace(tzinfo=None)
+
+
+def empty_rollup(user_id, day):
+    """Return an aggregate row for a day with no entries"""
+    return {
+        'user_id': user_id,
+        'day': day.isoformat(),
+        'entry_count': 0,
+        'mood_value_sum': 0,
+        'mood_counts': {},
+        'hour_counts': {},
+        'hour_sums': {}
+    }
+
+
+def add_entry_to_rollup(rollup, mood, timestamp, sign=1):
+    """Fold one diary entry into (sign=1) or out of (sign=-1) a day's aggregate row"""
+    mood = normalize_mood(mood)
+    value = MOOD_VALUES.get(mood, 3)
+    hour = str(timestamp.hour)
+
+    rollup['entry_count'] += sign
+    rollup['mood_value_sum'] += sign * value
+    for field, key, amount in (('mood_counts', mood, sign),
+                               ('hour_counts', hour, sign),
+                               ('hour_sums', hour, sign * value)):
+        counts = dict(rollup.get(field) or {})
+        counts[key] = counts.get(key, 0) + amount
+        if counts[key] == 0:
+            del counts[key]
+        rollup[field] = counts
+    return rollup
+
+
+def rollup_params(user_id, mood, timestamp, sign=1):
+    """Arguments of the apply_mood_rollup database function for one diary entry"""
+    mood = normalize_mood(mood)
+    return {
+        'p_user_id': user_id,
+        'p_day': timestamp.date().isoformat(),
+        'p_mood': mood,
+        'p_hour': str(timestamp.hour),
+        'p_value': MOOD_VALUES.get(mood, 3),
+        'p_sign': sign
+    }
+
+
+def build_rollups(user_id, diary_entries):
+    """Aggregate a user's raw diary history into per-day rollup rows"""
+    rollups = {}
+    for entry in diary_entries:
+        if not entry.get('created_at'):
+            continue
+        timestamp = parse_created_at(entry['created_at'])
+        rollup = rollups.setdefault(timestamp.date(), empty_rollup(user_id, timestamp.date()))
+        add_entry_to_rollup(rollup, entry.get('mood'), timestamp)
+    return [rollups[day] for day in sorted(rollups)]
+
+
+def backfill(db, user_ids):
+    """Rebuild the rollups of every given user from their diary history"""
+    for user_id in user_ids:
+        entries = db.iter_emotional_diary_history(user_id, columns='mood, created_at')
+        rows = db.rebuild_mood_rollups(user_id, entries)
+        print(f"Rebuilt {rows} daily mood rollups for user {user_id}")
+
+
+if __name__ == "__main__":
+    from database import get_db
+
+    parser = argparse.ArgumentParser(description="Rebuild daily mood rollups from emotional diary history")
+    parser.add_argument("--user-id", action="append", help="only rebuild this user (repeatable)")
+    args = parser.parse_args()
+
+    db = get_db()
+    backfill(db, args.user_id or db.get_all_user_ids())
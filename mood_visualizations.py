@@ -6,52 +6,77 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import calendar
-from database import SupabaseClient
+from collections import OrderedDict
+from database import get_db, DatabaseReadError
+from mood_rollups import MOOD_VALUES, TIME_BUCKETS, get_time_bucket
 import json
+import os
 import re
+import threading
+import time
+import metrics
+
+
+# Most markers the mood timeline sends to the browser; longer histories are downsampled
+MOOD_TIMELINE_MAX_POINTS = int(os.getenv("MOOD_TIMELINE_MAX_POINTS", "500"))
+# Users whose prepared mood DataFrame is kept in memory; the least recently viewed are dropped first
+MOOD_FRAME_CACHE_SIZE = int(os.getenv("MOOD_FRAME_CACHE_SIZE", "128"))
+
+# Mood keywords with priority (more specific first), compiled once
+MOOD_PATTERNS = {
+    mood: re.compile(pattern) for mood, pattern in {
+        'excited': r'\b(excited|thrilled|ecstatic|elated)\b',
+        'happy': r'\b(happy|joyful|cheerful|delighted|glad)\b',
+        'grateful': r'\b(grateful|thankful|blessed|appreciative)\b',
+        'content': r'\b(content|satisfied|peaceful|serene)\b',
+        'calm': r'\b(calm|relaxed|tranquil|composed)\b',
+        'anxious': r'\b(anxious|nervous|worried|concerned|uneasy)\b',
+        'stressed': r'\b(stressed|overwhelmed|pressured|tense)\b',
+        'sad': r'\b(sad|down|depressed|gloomy|melancholy)\b',
+        'angry': r'\b(angry|mad|furious|irritated|annoyed)\b',
+        'frustrated': r'\b(frustrated|annoyed|irritated|fed up)\b',
+        'tired': r'\b(tired|exhausted|weary|drained|fatigue)\b',
+        'confused': r'\b(confused|uncertain|puzzled|lost)\b',
+        'lonely': r'\b(lonely|isolated|alone|disconnected)\b',
+        'disappointed': r'\b(disappointed|let down|discouraged)\b'
+    }.items()
+}
+
+TIMESTAMP_FIELDS = ['created_at', 'timestamp', 'date', 'created']
+MOOD_FIELDS = ['mood', 'emotions']
+TEXT_FIELDS = ['entry', 'content', 'text', 'description']
+
+# The dtypes pandas infers for lists of Python datetimes and strings differ across versions
+DATETIME_DTYPE = pd.Series([datetime(2000, 1, 1)]).dtype
+STRING_DTYPE = pd.Series(['neutral']).dtype
+
+# Timestamps that a single vectorized ISO parse handles exactly like parse_datetime_flexible
+ISO_TIMESTAMP_PATTERN = r'^\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?| \d{2}:\d{2}:\d{2})?$'
 
 
 def extract_mood_from_entry(entry):
     """Extract mood from diary entry with multiple fallback methods"""
     # Method 1: Direct mood field
-    if 'mood' in entry and entry['mood']:
-        mood = str(entry['mood']).lower().strip()
-        if mood and mood != 'none':
-            return mood
-    
     # Method 2: Check if mood is in emotions field
-    if 'emotions' in entry and entry['emotions']:
-        emotions = str(entry['emotions']).lower().strip()
-        if emotions and emotions != 'none':
-            return emotions
+    for field in MOOD_FIELDS:
+        if field in entry and entry[field]:
+            mood = str(entry[field]).lower().strip()
+            if mood and mood != 'none':
+                return mood
     
+    return extract_mood_from_text(entry)
+
+
+def extract_mood_from_text(entry):
+    """Extract mood from the entry text using common mood keywords"""
     # Method 3: Extract from entry text using common mood keywords
-    text_fields = ['entry', 'content', 'text', 'description']
-    for field in text_fields:
+    for field in TEXT_FIELDS:
         if field in entry and entry[field]:
             text = str(entry[field]).lower()
             
-            # Define mood keywords with priority (more specific first)
-            mood_patterns = {
-                'excited': r'\b(excited|thrilled|ecstatic|elated)\b',
-                'happy': r'\b(happy|joyful|cheerful|delighted|glad)\b',
-                'grateful': r'\b(grateful|thankful|blessed|appreciative)\b',
-                'content': r'\b(content|satisfied|peaceful|serene)\b',
-                'calm': r'\b(calm|relaxed|tranquil|composed)\b',
-                'anxious': r'\b(anxious|nervous|worried|concerned|uneasy)\b',
-                'stressed': r'\b(stressed|overwhelmed|pressured|tense)\b',
-                'sad': r'\b(sad|down|depressed|gloomy|melancholy)\b',
-                'angry': r'\b(angry|mad|furious|irritated|annoyed)\b',
-                'frustrated': r'\b(frustrated|annoyed|irritated|fed up)\b',
-                'tired': r'\b(tired|exhausted|weary|drained|fatigue)\b',
-                'confused': r'\b(confused|uncertain|puzzled|lost)\b',
-                'lonely': r'\b(lonely|isolated|alone|disconnected)\b',
-                'disappointed': r'\b(disappointed|let down|discouraged)\b'
-            }
-            
             # Search for mood patterns
-            for mood, pattern in mood_patterns.items():
-                if re.search(pattern, text):
+            for mood, pattern in MOOD_PATTERNS.items():
+                if pattern.search(text):
                     return mood
     
     # Method 4: Default mood based on overall sentiment
@@ -98,81 +123,75 @@ def parse_datetime_flexible(date_string):
         return None
 
 
+def first_present_values(entries, fields):
+    """Return, for each entry, the value of the first non-empty field (None if there is none)"""
+    values = []
+    for entry in entries:
+        value = None
+        for field in fields:
+            if field in entry and entry[field]:
+                value = entry[field]
+                break
+        values.append(value)
+    return values
+
+
+def parse_datetime_series(values):
+    """Vectorized parse_datetime_flexible: ISO timestamps in one pass, stragglers row by row"""
+    raw = pd.Series(values, dtype=object)
+    present = raw.notna()
+
+    cleaned = raw[present].astype(str).str.strip()
+    cleaned = cleaned.str.replace(r'[+-]\d{2}:?\d{2}$', '', regex=True).str.replace(r'Z$', '', regex=True)
+    iso = cleaned[cleaned.str.match(ISO_TIMESTAMP_PATTERN)]
+
+    parsed = pd.Series(pd.NaT, index=raw.index, dtype=DATETIME_DTYPE)
+    parsed[iso.index] = pd.to_datetime(iso, format='ISO8601', errors='coerce')
+
+    # Anything the fast path could not handle goes through the flexible parser
+    stragglers = raw[present & parsed.isna()]
+    fallback = {index: parse_datetime_flexible(value) for index, value in stragglers.items()}
+    fallback = {index: value for index, value in fallback.items() if value is not None}
+    if fallback:
+        parsed[list(fallback)] = pd.to_datetime(list(fallback.values()))
+    return parsed
+
+
+def extract_mood_series(entries):
+    """Vectorized extract_mood_from_entry over a list of entries"""
+    moods = pd.Series([None] * len(entries), dtype=object)
+
+    for field in MOOD_FIELDS:
+        raw = pd.Series([entry.get(field) for entry in entries], dtype=object)
+        candidates = raw[moods.isna() & raw.map(bool)].astype(str).str.lower().str.strip()
+        candidates = candidates[(candidates != '') & (candidates != 'none')]
+        moods[candidates.index] = candidates
+
+    # Only entries without a usable mood field need the keyword scan
+    missing = moods.index[moods.isna()]
+    moods[missing] = [extract_mood_from_text(entries[index]) for index in missing]
+    return moods
+
+
 def prepare_mood_data(diary_entries):
     """Convert diary entries to DataFrame for visualization with robust parsing"""
     if not diary_entries:
         return None
     
-    # Initialize lists for DataFrame
-    dates = []
-    moods = []
-    timestamps = []
-    
-    # Enhanced mood values with more granular scoring
-    mood_values = {
-        # Very positive (5)
-        "excited": 5, "thrilled": 5, "ecstatic": 5, "elated": 5, "joyful": 5, "euphoric": 5,
-        
-        # Positive (4)
-        "happy": 4, "cheerful": 4, "delighted": 4, "glad": 4, "content": 4, 
-        "grateful": 4, "thankful": 4, "blessed": 4, "peaceful": 4, "proud": 4,
-        
-        # Neutral/Calm (3)
-        "calm": 3, "neutral": 3, "relaxed": 3, "tranquil": 3, "composed": 3, 
-        "reflective": 3, "thoughtful": 3, "okay": 3, "fine": 3,
-        
-        # Slightly negative (2)
-        "confused": 2, "uncertain": 2, "worried": 2, "concerned": 2, "uneasy": 2,
-        "tired": 2, "weary": 2, "drained": 2, "restless": 2, "bored": 2,
-        
-        # Negative (1)
-        "anxious": 1, "stressed": 1, "overwhelmed": 1, "sad": 1, "down": 1,
-        "angry": 1, "frustrated": 1, "annoyed": 1, "lonely": 1, "isolated": 1,
-        "disappointed": 1, "discouraged": 1, "depressed": 1, "furious": 1
-    }
-    
-    # Process each entry
-    for entry in diary_entries:
-        try:
-            # Extract timestamp
-            timestamp_fields = ['created_at', 'timestamp', 'date', 'created']
-            timestamp_str = None
-            
-            for field in timestamp_fields:
-                if field in entry and entry[field]:
-                    timestamp_str = entry[field]
-                    break
-            
-            if not timestamp_str:
-                continue
-            
-            # Parse the timestamp
-            parsed_datetime = parse_datetime_flexible(timestamp_str)
-            if not parsed_datetime:
-                continue
-            
-            # Extract mood
-            mood = extract_mood_from_entry(entry)
-            if not mood:
-                mood = 'neutral'
-            
-            # Add to lists
-            dates.append(parsed_datetime.date())
-            timestamps.append(parsed_datetime)
-            moods.append(mood)
-            
-        except Exception:
-            continue
-    
-    if not timestamps:
+    timestamps = parse_datetime_series(first_present_values(diary_entries, TIMESTAMP_FIELDS))
+    valid = timestamps.notna()
+    if not valid.any():
         return None
     
+    timestamps = timestamps[valid].reset_index(drop=True)
+    moods = extract_mood_series([diary_entries[index] for index in valid.index[valid]])
+    
     # Create DataFrame
     df = pd.DataFrame({
-        'date': dates,
+        'date': timestamps.dt.date,
         'timestamp': timestamps,
-        'mood': moods,
-        'mood_value': [mood_values.get(m.lower(), 3) for m in moods]
+        'mood': moods.astype(STRING_DTYPE),
+        'mood_value': moods.str.lower().map(MOOD_VALUES).fillna(3).astype('int64')
     })
     
     # Sort by timestamp
@@ -181,13 +200,78 @@ def prepare_mood_data(diary_entries):
     return df
 
 
-def create_mood_timeline(diary_entries):
-    """Create a timeline visualization of mood entries"""
+_mood_frames = OrderedDict()
+_mood_frames_lock = threading.Lock()
+
+
+def get_mood_frame(user_id, diary_entries):
+    """Return the user's mood DataFrame, rebuilding it only when the diary history changes"""
+    if not diary_entries:
+        return None
+
+    # A new or deleted entry changes either the newest timestamp or the count
+    key = (max(str(entry.get('created_at') or '') for entry in diary_entries), len(diary_entries))
+    with _mood_frames_lock:
+        cached = _mood_frames.get(user_id)
+        if cached and cached[0] == key:
+            _mood_frames.move_to_end(user_id)
+            return cached[1]
+
     df = prepare_mood_data(diary_entries)
-    if df is None or df.empty:
-        st.info("📊 Not enough data to generate mood timeline. Keep logging your moods!")
-        return
+    with _mood_frames_lock:
+        _mood_frames[user_id] = (key, df)
+        _mood_frames.move_to_end(user_id)
+        while len(_mood_frames) > MOOD_FRAME_CACHE_SIZE:
+            _mood_frames.popitem(last=False)
+    return df
+
+
+def prepare_rollup_data(rollups):
+    """Convert daily mood rollup rows to a DataFrame ordered by day"""
+    if not rollups:
+        return None
+    
+    df = pd.DataFrame(rollups)
+    df = df[df['entry_count'] > 0]
+    if df.empty:
+        return None
+    
+    df['day'] = pd.to_datetime(df['day'])
+    return df.sort_values('day').reset_index(drop=True)
+
+
+def load_mood_rollups(db, user_id, expected_count=None, rollups=None):
+    """Fetch a user's daily mood rollups (unless already fetched), rebuilding them when missing or stale"""
+    if rollups is None:
+        rollups = db.get_mood_rollups(user_id)
+    rolled_up = sum(row['entry_count'] for row in rollups)
+    
+    if (expected_count is None and not rollups) or (expected_count is not None and rolled_up != expected_count):
+        try:
+            db.rebuild_mood_rollups(user_id, db.iter_emotional_diary_history(user_id, columns='mood, created_at'))
+        except DatabaseReadError:
+            # History could not be read in full; show the rollups we have rather than rebuild from part of it
+            return prepare_rollup_data(rollups)
+        rollups = db.get_mood_rollups(user_id)
     
+    return prepare_rollup_data(rollups)
+
+
+def downsample_mood_timeline(df, max_points=MOOD_TIMELINE_MAX_POINTS):
+    """Reduce a mood frame to at most max_points rows, keeping each time bucket's lowest and highest mood"""
+    if df is None or len(df) <= max_points:
+        return df
+    
+    # Equal-width time buckets; two points per bucket plus the first and last entry
+    buckets = max(1, (max_points - 2) // 2)
+    bucket_ids = pd.cut(df['timestamp'].astype('int64'), bins=buckets, labels=False)
+    grouped = df['mood_value'].groupby(bucket_ids)
+    keep = set(grouped.idxmin()) | set(grouped.idxmax()) | {df.index[0], df.index[-1]}
+    return df.loc[sorted(keep)]
+
+
+def build_mood_timeline_figure(df):
+    """Build the mood timeline figure for an already downsampled mood frame"""
     # Create mood color mapping
     mood_colors = {
         1: "#DC3545",  # Red - Negative
@@ -209,11 +293,10 @@ def create_mood_timeline(diary_entries):
         line=dict(color='#6C757D', width=2),
         marker=dict(
             size=10,
-            color=[mood_colors.get(val, "#FFC107") for val in df['mood_value']],
+            color=df['mood_value'].map(mood_colors).fillna("#FFC107"),
             line=dict(width=2, color='white')
         ),
-        text=[f"Mood: {mood}<br>Date: {ts.strftime('%Y-%m-%d %H:%M')}" 
-              for mood, ts in zip(df['mood'], df['timestamp'])],
+        text="Mood: " + df['mood'].astype(str) + "<br>Date: " + df['timestamp'].dt.strftime('%Y-%m-%d %H:%M'),
         hovertemplate='%{text}<extra></extra>'
     ))
     
@@ -234,8 +317,36 @@ def create_mood_timeline(diary_entries):
         plot_bgcolor='rgba(0,0,0,0)',
         showlegend=False
     )
+    return fig
+
+
+def create_mood_timeline(df):
+    """Create a timeline visualization of mood entries"""
+    if df is None or df.empty:
+        st.info("📊 Not enough data to generate mood timeline. Keep logging your moods!")
+        return
+    
+    # Let the user zoom into a date range, which is then drawn at full resolution
+    first_day, last_day = df['date'].iloc[0], df['date'].iloc[-1]
+    selected = st.date_input("Timeline range", value=(first_day, last_day),
+                             min_value=first_day, max_value=last_day, key="mood_timeline_range")
+    if isinstance(selected, (tuple, list)) and len(selected) == 2:
+        df = df[(df['date'] >= selected[0]) & (df['date'] <= selected[1])]
+        if df.empty:
+            st.info("No diary entries in the selected range.")
+            return
+    
+    started = time.perf_counter()
+    plotted = downsample_mood_timeline(df)
+    fig = build_mood_timeline_figure(plotted)
+    metrics.observe('mood_timeline_points', len(plotted))
     
     st.plotly_chart(fig, use_container_width=True)
+    metrics.record_timing('mood_timeline_render', time.perf_counter() - started)
+    
+    if len(plotted) < len(df):
+        st.caption(f"Showing {len(plotted)} of {len(df)} entries, keeping the highs and lows of each period. "
+                   "Narrow the range to see every entry.")
     
     # Show recent trend
     if len(df) >= 2:
@@ -246,20 +357,26 @@ def create_mood_timeline(diary_entries):
         st.info(f"Recent trend: {trend_emoji[recent_trend]} {recent_trend.title()}")
 
 
-def create_mood_distribution(diary_entries):
+def create_mood_distribution(rollups):
     """Create a donut chart showing distribution of moods"""
-    df = prepare_mood_data(diary_entries)
-    if df is None or df.empty:
+    if rollups is None or rollups.empty:
         st.info("📊 Not enough data to generate mood distribution.")
         return
     
+    # Total the per-day mood counts by sentiment level
+    level_counts = {}
+    for mood_counts in rollups['mood_counts']:
+        for mood, count in mood_counts.items():
+            level = MOOD_VALUES.get(mood.lower(), 3)
+            level_counts[level] = level_counts.get(level, 0) + count
+    
     # Group moods by sentiment level
     mood_groups = {
-        "Very Positive 😄": df[df['mood_value'] == 5],
-        "Positive 😊": df[df['mood_value'] == 4],
-        "Neutral 😐": df[df['mood_value'] == 3],
-        "Low 😕": df[df['mood_value'] == 2],
-        "Negative 😢": df[df['mood_value'] == 1]
+        "Very Positive 😄": level_counts.get(5, 0),
+        "Positive 😊": level_counts.get(4, 0),
+        "Neutral 😐": level_counts.get(3, 0),
+        "Low 😕": level_counts.get(2, 0),
+        "Negative 😢": level_counts.get(1, 0)
     }
     
     # Create counts and colors
@@ -275,8 +392,7 @@ def create_mood_distribution(diary_entries):
         "Negative 😢": "#DC3545"
     }
     
-    for group_name, group_df in mood_groups.items():
-        count = len(group_df)
+    for group_name, count in mood_groups.items():
         if count > 0:
             labels.append(group_name)
             values.append(count)
@@ -306,37 +422,28 @@ def create_mood_distribution(diary_entries):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def create_weekly_mood_chart(diary_entries):
+def create_weekly_mood_chart(rollups):
     """Create a heatmap of moods by day of week and time of day"""
-    df = prepare_mood_data(diary_entries)
-    if df is None or df.empty:
+    if rollups is None or rollups.empty:
         st.info("📊 Not enough data to generate weekly mood patterns.")
         return
     
-    # Add day of week and hour columns
-    df['day_of_week'] = df['timestamp'].dt.day_name()
-    df['hour'] = df['timestamp'].dt.hour
-    
-    # Create time buckets
-    def get_time_bucket(hour):
-        if 5 <= hour < 12:
-            return 'Morning'
-        elif 12 <= hour < 17:
-            return 'Afternoon'
-        elif 17 <= hour < 21:
-            return 'Evening'
-        else:
-            return 'Night'
-    
-    df['time_bucket'] = df['hour'].apply(get_time_bucket)
+    # Expand each day's hourly counts and mood sums into (day of week, time bucket) cells
+    cells = []
+    for day, hour_counts, hour_sums in zip(rollups['day'], rollups['hour_counts'], rollups['hour_sums']):
+        day_of_week = day.day_name()
+        for hour, count in hour_counts.items():
+            cells.append((day_of_week, get_time_bucket(int(hour)), count, hour_sums.get(hour, 0)))
+    cells = pd.DataFrame(cells, columns=['day_of_week', 'time_bucket', 'count', 'mood_sum'])
     
     # Order days and times
     days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    time_order = ['Morning', 'Afternoon', 'Evening', 'Night']
+    time_order = TIME_BUCKETS
     
     # Calculate average mood by day and time bucket
-    if len(df) > 0:
-        avg_mood = df.groupby(['day_of_week', 'time_bucket'])['mood_value'].mean().reset_index()
+    if cells['count'].sum() > 0:
+        totals = cells.groupby(['day_of_week', 'time_bucket'])[['count', 'mood_sum']].sum()
+        avg_mood = (totals['mood_sum'] / totals['count']).rename('mood_value').reset_index()
         
         # Create pivot table
         pivot_df = avg_mood.pivot(index='day_of_week', columns='time_bucket', values='mood_value')
@@ -363,21 +470,20 @@ def create_weekly_mood_chart(diary_entries):
         st.info("Not enough data for weekly patterns analysis.")
 
 
-def get_recent_mood_trend(diary_entries, days=7):
+def get_recent_mood_trend(rollups, days=7):
     """Calculate the mood trend over the specified days"""
-    df = prepare_mood_data(diary_entries)
-    if df is None or df.empty:
+    if rollups is None or rollups.empty:
         return "neutral", "steady"
     
-    # Filter for recent entries
-    cutoff_date = datetime.now() - timedelta(days=days)
-    recent_df = df[df['timestamp'] >= cutoff_date]
+    # Filter for recent days
+    cutoff_date = pd.Timestamp((datetime.now() - timedelta(days=days)).date())
+    recent_df = rollups[rollups['day'] >= cutoff_date]
     
     if recent_df.empty:
         return "neutral", "steady"
     
     # Calculate average mood
-    avg_mood = recent_df['mood_value'].mean()
+    avg_mood = recent_df['mood_value_sum'].sum() / recent_df['entry_count'].sum()
     
     # Determine dominant mood category
     if avg_mood >= 4.5:
@@ -391,11 +497,12 @@ def get_recent_mood_trend(diary_entries, days=7):
     else:
         dominant_mood = "very negative"
     
-    # Calculate trend
-    if len(recent_df) >= 3:
-        recent_df = recent_df.sort_values('timestamp')
-        first_half_avg = recent_df.iloc[:len(recent_df)//2]['mood_value'].mean()
-        second_half_avg = recent_df.iloc[len(recent_df)//2:]['mood_value'].mean()
+    # Calculate trend from the earlier and later halves of the recent days
+    if recent_df['entry_count'].sum() >= 3 and len(recent_df) >= 2:
+        first_half = recent_df.iloc[:len(recent_df)//2]
+        second_half = recent_df.iloc[len(recent_df)//2:]
+        first_half_avg = first_half['mood_value_sum'].sum() / first_half['entry_count'].sum()
+        second_half_avg = second_half['mood_value_sum'].sum() / second_half['entry_count'].sum()
         
         if second_half_avg > first_half_avg + 0.3:
             trend = "improving"
@@ -409,17 +516,24 @@ def get_recent_mood_trend(diary_entries, days=7):
     return dominant_mood, trend
 
 
-def create_dashboard_mood_summary(user_id):
-    """Create a summary of mood data for the dashboard"""
+def create_dashboard_mood_summary(user_id, recent_entries=None, rollup_rows=None, diary_count=None):
+    """Create a summary of mood data for the dashboard, from already fetched rows when given.
+
+    diary_count, the user's number of diary entries, lets rollups that drifted from the diary be rebuilt.
+    """
     try:
-        db = SupabaseClient()
-        diary_entries = db.get_emotional_diary_history(user_id)
+        db = get_db()
+        if recent_entries is None:
+            recent_entries = db.get_recent_emotional_diary_entries(user_id, limit=10, columns='mood, created_at')
         
-        if not diary_entries:
+        if not recent_entries:
             st.warning("🔄 No mood data available yet. Start using the Emotional Diary to track your moods!")
             return
         
-        dominant_mood, trend = get_recent_mood_trend(diary_entries)
+        if diary_count is None:
+            diary_count = db.count_emotional_diary_entries(user_id)
+        rollups = load_mood_rollups(db, user_id, expected_count=diary_count, rollups=rollup_rows)
+        dominant_mood, trend = get_recent_mood_trend(rollups)
         
         # Display current mood trend
         st.subheader("Your Recent Mood Status")
@@ -457,13 +571,12 @@ def create_dashboard_mood_summary(user_id):
             st.markdown(f"**Trend:** {trend_info['desc']} {trend_info['emoji']}")
             
             # Count recent entries
-            recent_count = len([e for e in diary_entries 
-                              if (datetime.now() - parse_datetime_flexible(e.get('created_at', ''))).days <= 7
-                              if parse_datetime_flexible(e.get('created_at', ''))])
+            cutoff_date = pd.Timestamp((datetime.now() - timedelta(days=7)).date())
+            recent_count = int(rollups.loc[rollups['day'] >= cutoff_date, 'entry_count'].sum()) if rollups is not None else 0
             st.markdown(f"**Recent entries:** {recent_count} this week")
         
         # Mini mood chart
-        df = prepare_mood_data(diary_entries)
+        df = prepare_mood_data(recent_entries)
         if df is not None and len(df) > 1:
             recent_df = df.tail(10)  # Last 10 entries
             
@@ -495,7 +608,7 @@ def create_dashboard_mood_summary(user_id):
 def display_mood_visualizations(user_id):
     """Display all mood visualizations as a single comprehensive page"""
     try:
-        db = SupabaseClient()
+        db = get_db()
         diary_entries = db.get_emotional_diary_history(user_id)
         
         if not diary_entries:
@@ -508,7 +621,8 @@ def display_mood_visualizations(user_id):
         st.markdown("*Discover patterns in your emotional journey*")
         
         # Key insights at the top
-        df = prepare_mood_data(diary_entries)
+        df = get_mood_frame(user_id, diary_entries)
+        rollups = load_mood_rollups(db, user_id, expected_count=len(diary_entries))
         if df is not None and not df.empty:
             col1, col2, col3, col4 = st.columns(4)
             
@@ -531,18 +645,18 @@ def display_mood_visualizations(user_id):
         
         # Main visualizations
         st.subheader("📈 Mood Timeline")
-        create_mood_timeline(diary_entries)
+        create_mood_timeline(df)
         
         # Two column layout for distribution and patterns
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("🎯 Mood Distribution")
-            create_mood_distribution(diary_entries)
+            create_mood_distribution(rollups)
         
         with col2:
             st.subheader("📅 Weekly Patterns")
-            create_weekly_mood_chart(diary_entries)
+            create_weekly_mood_chart(rollups)
         
         # Insights section
         st.markdown("---")
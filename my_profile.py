@@ -1,7 +1,9 @@
 # profile.py
 
 import streamlit as st
-from database import SupabaseClient
+import metrics
+from database import get_db
+from async_database import fetch_page_data
 from auth import hash_password, verify_password
 
 
@@ -13,10 +15,14 @@ def display_profile_update():
         st.warning("Please log in to view and update your profile.")
         return
     
-    # Get current user data
-    db = SupabaseClient()
+    # Get current user data and medical conditions concurrently
+    db = get_db()
     user_id = st.session_state['user_id']
-    user = db.get_user_by_id(user_id)
+    page_data = fetch_page_data('profile', {
+        'user': ('get_user_by_id', (user_id,), None),
+        'medical_info': ('get_user_medical_info', (user_id,), []),
+    }, db=db)
+    user = page_data['user']
     
     if not user:
         st.error("Could not retrieve user information. Please try again later.")
@@ -69,7 +75,8 @@ def display_profile_update():
                     update_data['password_hash'] = hash_password(new_password)
                 
                 # Update in database
-                success = db.update_user(user_id, update_data)
+                with metrics.timer('profile_save'):
+                    success = db.update_user(user_id, update_data)
                 
                 if success:
                     # Update session state
@@ -83,8 +90,8 @@ def display_profile_update():
     with tab2:
         st.subheader("Update Medical Information")
         
-        # Get current medical conditions
-        medical_info = db.get_user_medical_info(user_id)
+        # Current medical conditions, loaded with the user above
+        medical_info = page_data['medical_info']
         current_conditions = {info['condition_name']: info['condition_type'] for info in medical_info}
         
         # Form for updating medical info
@@ -124,7 +131,8 @@ def display_profile_update():
                 }
                 
                 # Clear existing medical info and add new ones
-                success = db.update_medical_info(user_id, new_conditions)
+                with metrics.timer('medical_info_save'):
+                    success = db.update_medical_info(user_id, new_conditions)
                 
                 if success:
                     st.success("Medical information updated successfully!")
@@ -0,0 +1,232 @@
+# ocr_engine.py
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+import numpy as np
+import metrics
+
+# "n8n" sends uploads to the webhook workflow; "local" recognises them here with doctr
+OCR_MODE = os.getenv("OCR_MODE", "n8n")
+# Recognition is CPU-bound, so pages are spread over worker processes rather than threads
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, min(4, (os.cpu_count() or 1) - 1)))))
+OCR_DET_ARCH = os.getenv("OCR_DET_ARCH", "db_mobilenet_v3_large")
+OCR_RECO_ARCH = os.getenv("OCR_RECO_ARCH", "crnn_mobilenet_v3_small")
+# PDF pages are rendered at 72 dpi times this scale
+OCR_PDF_SCALE = float(os.getenv("OCR_PDF_SCALE", "2"))
+# Longer page sides are scaled down to this many pixels before detection
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "2048"))
+# PDFs with more pages are refused before any page is rendered
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "50"))
+
+
+def is_pdf(content, filename=""):
+    """Whether a document is a PDF, by name or by its magic bytes"""
+    return str(filename).lower().endswith(".pdf") or content[:5] == b"%PDF-"
+
+
+def load_pages(content, filename="", max_pages=OCR_MAX_PAGES):
+    """Decode a document (bytes) into RGB page images, one per PDF page.
+
+    A PDF with more than max_pages pages raises ValueError before anything is rendered.
+    """
+    if is_pdf(content, filename):
+        # What doctr's DocumentFile.from_pdf does, with the page count checked first
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(content)
+        try:
+            if len(pdf) > max_pages:
+                raise ValueError(f"'{filename}' has {len(pdf)} pages; at most {max_pages} can be processed")
+            return [page.render(scale=OCR_PDF_SCALE, rev_byteorder=True).to_numpy() for page in pdf]
+        finally:
+            pdf.close()
+
+    import cv2
+    image = cv2.imdecode(np.frombuffer(content, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError(f"Could not read '{filename}' as an image")
+    return [cv2.cvtColor(image, cv2.COLOR_BGR2RGB)]
+
+
+def preprocess_page(page, max_side=OCR_MAX_SIDE):
+    """Scale an oversized page down and even out its lighting before recognition"""
+    import cv2
+
+    height, width = page.shape[:2]
+    scale = max_side / max(height, width)
+    if scale < 1:
+        page = cv2.resize(page, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(page, cv2.COLOR_RGB2GRAY)
+    gray = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(gray)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB)
+
+
+def annotate_page(page, blocks, color=(255, 0, 0), encoding=".png"):
+    """Draw every block's box and "text" (confidence%) label on a copy of an RGB page in one pass.
+
+    All boxes go to OpenCV in one polylines call and the image is encoded once, instead of
+    being re-encoded per block as in the n8n Edit Image loop. Returns the encoded image; the
+    structured output is the blocks list itself, which recognize_page already returns.
+    """
+    import cv2
+
+    image = cv2.cvtColor(page, cv2.COLOR_RGB2BGR)
+    bgr = color[::-1]
+    if blocks:
+        corners = np.array([[b['bbox']['x0'], b['bbox']['y0'], b['bbox']['x1'], b['bbox']['y1']] for b in blocks],
+                           dtype=np.int32)
+        boxes = corners[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 4, 2)
+        cv2.polylines(image, list(boxes), True, bgr, 1)
+        for block, (x0, y0) in zip(blocks, corners[:, :2]):
+            label = f'"{block["text"].strip()}" ({block["confidence"]:.0f}%)'
+            cv2.putText(image, label, (int(x0), max(int(y0) - 2, 8)), cv2.FONT_HERSHEY_SIMPLEX, 0.3, bgr, 1,
+                        cv2.LINE_AA)
+
+    encoded, data = cv2.imencode(encoding, image)
+    if not encoded:
+        raise ValueError(f"Could not encode the annotated page as {encoding}")
+    return data.tobytes()
+
+
+_predictor = None
+
+
+def _init_worker(det_arch, reco_arch, pretrained):
+    """Load the doctr predictor once per worker process"""
+    global _predictor
+    import torch
+    from doctr.models import ocr_predictor
+
+    # One thread per process; the pool provides the parallelism
+    torch.set_num_threads(1)
+    _predictor = ocr_predictor(det_arch, reco_arch, pretrained=pretrained, pretrained_backbone=pretrained)
+
+
+def recognize_page(page, annotate=False):
+    """Run detection and recognition on one page and return its text and word boxes.
+
+    Returns {'text', 'blocks', 'width', 'height', 'seconds'}; 'blocks' is the structured output,
+    one {'text', 'confidence', 'bbox'} per word, in pixels of the preprocessed page, with
+    Tesseract-style bbox keys and confidences in percent. With annotate, the result also holds
+    that page as a PNG with the boxes drawn on it.
+    """
+    started = time.perf_counter()
+    page = preprocess_page(page)
+    result = _predictor([page]).pages[0]
+    height, width = result.dimensions
+
+    lines, blocks = [], []
+    for block in result.blocks:
+        for line in block.lines:
+            lines.append(" ".join(word.value for word in line.words))
+            for word in line.words:
+                (x0, y0), (x1, y1) = word.geometry
+                blocks.append({
+                    'text': word.value,
+                    'confidence': round(float(word.confidence) * 100, 1),
+                    'bbox': {'x0': round(x0 * width), 'y0': round(y0 * height),
+                             'x1': round(x1 * width), 'y1': round(y1 * height)}
+                })
+    recognized = {
+        'text': "\n".join(lines),
+        'blocks': blocks,
+        'width': width,
+        'height': height
+    }
+    if annotate:
+        recognized['annotated'] = annotate_page(page, blocks)
+    recognized['seconds'] = time.perf_counter() - started
+    return recognized
+
+
+class OCREngine:
+    """In-process alternative to the n8n OCR workflow.
+
+    Pages of a document are recognised in parallel by a pool of worker processes,
+    each holding its own doctr model, so there is no Drive or OCR.space round trip.
+    """
+
+    def __init__(self, workers=OCR_WORKERS, det_arch=OCR_DET_ARCH, reco_arch=OCR_RECO_ARCH, pretrained=True):
+        self.workers = max(1, workers)
+        self.det_arch = det_arch
+        self.reco_arch = reco_arch
+        self.pretrained = pretrained
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn, not fork: the app process already runs threads (Streamlit, torch, the writer)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_worker,
+                                                 initargs=(self.det_arch, self.reco_arch, self.pretrained))
+            return self._pool
+
+    def _drop_pool(self, pool):
+        """Forget a pool whose worker died, so the next call starts a fresh one"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        metrics.increment("ocr_pool_restarts")
+
+    def _recognize(self, pages, annotate):
+        """Recognise pages on the pool, restarting it once if a worker process has died"""
+        pool = self._get_pool()
+        try:
+            return list(pool.map(recognize_page, pages, repeat(annotate)))
+        except BrokenProcessPool:
+            self._drop_pool(pool)
+        return list(self._get_pool().map(recognize_page, pages, repeat(annotate)))
+
+    def warm_up(self):
+        """Start the worker processes and load their models ahead of the first document"""
+        blank = np.full((64, 64, 3), 255, dtype=np.uint8)
+        list(self._get_pool().map(recognize_page, [blank] * self.workers))
+
+    def extract(self, content, filename="", annotate=False):
+        """OCR a document (bytes) and return {'text', 'pages'} with per-page text and word boxes.
+
+        With annotate, every page also carries an 'annotated' PNG with its boxes drawn.
+        """
+        with metrics.timer("ocr_load_pages"):
+            pages = load_pages(content, filename)
+        with metrics.timer("ocr_document"):
+            results = self._recognize(pages, annotate)
+        metrics.increment("ocr_pages", len(results))
+        for result in results:
+            metrics.record_timing("ocr_page", result['seconds'])
+        return {
+            'text': "\n\n".join(result['text'] for result in results if result['text']),
+            'pages': results
+        }
+
+    def extract_text(self, content, filename=""):
+        """OCR a document and return only its text"""
+        return self.extract(content, filename)['text']
+
+    def close(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+_lock = threading.Lock()
+_ocr_engine = None
+
+
+def get_ocr_engine():
+    """Return the process-wide OCR engine; its worker processes start on first use"""
+    global _ocr_engine
+    with _lock:
+        if _ocr_engine is None:
+            _ocr_engine = OCREngine()
+        return _ocr_engine
@@ -0,0 +1,280 @@
+# persistence.py
+
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+import metrics
+from database import get_db, DatabaseWriteError
+
+PERSIST_QUEUE_SIZE = int(os.getenv("PERSIST_QUEUE_SIZE", "1000"))
+PERSIST_BATCH_SIZE = int(os.getenv("PERSIST_BATCH_SIZE", "50"))
+# How long the worker waits for more rows before flushing a partial batch
+PERSIST_FLUSH_INTERVAL = float(os.getenv("PERSIST_FLUSH_INTERVAL", "0.5"))
+PERSIST_RETRY_DELAY = float(os.getenv("PERSIST_RETRY_DELAY", "0.5"))
+PERSIST_MAX_RETRY_DELAY = float(os.getenv("PERSIST_MAX_RETRY_DELAY", "30"))
+# A row the database keeps rejecting as invalid is set aside after this many tries
+PERSIST_MAX_ATTEMPTS = int(os.getenv("PERSIST_MAX_ATTEMPTS", "5"))
+# Every queued row is appended here first, so a crash loses nothing
+PERSIST_SPOOL_PATH = os.getenv("PERSIST_SPOOL_PATH", "persistence_spool.jsonl")
+PERSIST_DEAD_LETTER_PATH = os.getenv("PERSIST_DEAD_LETTER_PATH", "persistence_dead_letter.jsonl")
+# Stored rows are logged as ids next to the spool; the spool is rewritten once this many pile up
+PERSIST_COMPACT_EVERY = int(os.getenv("PERSIST_COMPACT_EVERY", "1000"))
+
+
+def _save_batch(kind, rows):
+    """Store a batch of rows of one kind; raises DatabaseWriteError on failure"""
+    db = get_db()
+    if kind == 'chat':
+        return db.save_chats(rows, strict=True)
+    if kind == 'diary':
+        return db.save_emotional_diary_entries(rows, strict=True)
+    raise ValueError(f"Unknown persistence kind: {kind}")
+
+
+def _append_lines(path, lines):
+    with open(path, "a", encoding="utf-8") as log:
+        log.writelines(line + "\n" for line in lines)
+        log.flush()
+        os.fsync(log.fileno())
+
+
+def _read_lines(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as log:
+        return [line for line in log.read().splitlines() if line.strip()]
+
+
+class WriteBehindWriter:
+    """Background worker that stores chat and diary rows off the request path.
+
+    Rows carry client-generated ids and the database skips ids it already has,
+    so batches replayed from the spool after a crash are never stored twice.
+    """
+
+    def __init__(self, spool_path=PERSIST_SPOOL_PATH, max_size=PERSIST_QUEUE_SIZE,
+                 batch_size=PERSIST_BATCH_SIZE, flush_interval=PERSIST_FLUSH_INTERVAL,
+                 dead_letter_path=PERSIST_DEAD_LETTER_PATH, max_attempts=PERSIST_MAX_ATTEMPTS,
+                 compact_every=PERSIST_COMPACT_EVERY):
+        self.spool_path = spool_path
+        self.saved_path = spool_path + ".saved"
+        self.dead_letter_path = dead_letter_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.compact_every = compact_every
+        self._queue = queue.Queue(maxsize=max_size)
+        self._pending = {}
+        self._deferred = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._saved_since_compaction = 0
+        self._failed_passes = 0
+
+        self._load_spool()
+        if self._deferred:
+            print(f"Replaying {len(self._deferred)} unsaved rows from {spool_path}")
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def _load_spool(self):
+        """Queue spooled rows that were never logged as stored, then compact both files"""
+        saved_ids = set(_read_lines(self.saved_path))
+        for line in _read_lines(self.spool_path):
+            try:
+                job = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash mid-write
+                continue
+            if job['row']['id'] not in saved_ids:
+                self._pending[job['row']['id']] = job
+        self._deferred = list(self._pending.values())
+        self._compact()
+
+    def _compact(self):
+        """Rewrite the spool with only the pending rows and clear the stored-ids log"""
+        with self._lock:
+            temp_path = self.spool_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as spool:
+                for job in self._pending.values():
+                    spool.write(json.dumps(job) + "\n")
+                spool.flush()
+                os.fsync(spool.fileno())
+            os.replace(temp_path, self.spool_path)
+            # Ids logged before a crash here point at rows no longer in the spool, which is harmless
+            open(self.saved_path, "w").close()
+            self._saved_since_compaction = 0
+
+    def _mark_saved(self, jobs):
+        """Log rows as stored (append-only), compacting the spool now and then"""
+        with self._lock:
+            for job in jobs:
+                self._pending.pop(job['row']['id'], None)
+        _append_lines(self.saved_path, [job['row']['id'] for job in jobs])
+        self._saved_since_compaction += len(jobs)
+        if self._saved_since_compaction >= self.compact_every:
+            self._compact()
+
+    def _dead_letter(self, job):
+        """Set aside a row the database keeps rejecting so it stops holding up the spool"""
+        _append_lines(self.dead_letter_path, [json.dumps(job)])
+        self._mark_saved([job])
+        metrics.increment("persistence_dead_letters")
+        print(f"Moved {job['kind']} row {job['row']['id']} to {self.dead_letter_path} "
+              f"after {job['attempts']} rejected attempts")
+
+    def submit(self, kind, row):
+        """Queue a row for storage and return its id without waiting for the database"""
+        row = dict(row, id=row.get('id') or str(uuid.uuid4()))
+        job = {'kind': kind, 'row': row}
+        with self._lock:
+            self._pending[row['id']] = job
+            _append_lines(self.spool_path, [json.dumps(job)])
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            # The row is spooled already; hand it to the worker's backlog rather than wait on the caller's thread
+            metrics.increment("persistence_queue_full")
+            with self._lock:
+                self._deferred.append(job)
+        metrics.observe("persistence_queue_depth", self._queue.qsize())
+        return row['id']
+
+    def _next_batch(self):
+        with self._lock:
+            batch, self._deferred = self._deferred[:self.batch_size], self._deferred[self.batch_size:]
+        if not batch:
+            try:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                return batch
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                break
+        return batch
+
+    def _store(self, kind, jobs):
+        """Try to store jobs of one kind in a single request; returns None when they were, else the error kind"""
+        try:
+            with metrics.timer(f"persistence_flush_{kind}"):
+                _save_batch(kind, [job['row'] for job in jobs])
+        except DatabaseWriteError as e:
+            return e.kind
+        metrics.increment("persisted_rows", len(jobs))
+        self._mark_saved(jobs)
+        return None
+
+    def _flush(self, batch):
+        """Store a batch and return the jobs still unsaved.
+
+        A batch that fails transiently is kept whole for a later pass. One the database
+        rejects is retried row by row, so a row it will never accept cannot hold back the
+        rest; each rejection counts an attempt, and a row is dead-lettered after max_attempts.
+        """
+        by_kind = {}
+        for job in batch:
+            by_kind.setdefault(job['kind'], []).append(job)
+
+        unsaved = []
+        for kind, jobs in by_kind.items():
+            error = self._store(kind, jobs)
+            if error is None:
+                continue
+            if error != 'permanent':
+                unsaved.extend(jobs)
+                continue
+
+            results = [(jobs[0], error)] if len(jobs) == 1 else [(job, self._store(kind, [job])) for job in jobs]
+            for job, error in results:
+                if error is None:
+                    continue
+                if error == 'permanent':
+                    job['attempts'] = job.get('attempts', 0) + 1
+                    if job['attempts'] >= self.max_attempts:
+                        self._dead_letter(job)
+                        continue
+                unsaved.append(job)
+        return unsaved
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                if self._stopping.is_set():
+                    return
+                continue
+            try:
+                unsaved = self._flush(batch)
+            except Exception as e:
+                print(f"Error in write-behind worker: {e}")
+                unsaved = batch
+            if not unsaved:
+                self._failed_passes = 0
+                continue
+
+            with self._lock:
+                self._deferred = unsaved + self._deferred
+            if self._stopping.is_set():
+                return
+            # Back off with jitter while the database is failing; rows stay spooled meanwhile
+            metrics.increment("persistence_retries")
+            self._failed_passes = self._failed_passes + 1 if len(unsaved) == len(batch) else 0
+            delay = min(PERSIST_RETRY_DELAY * 2 ** max(self._failed_passes - 1, 0), PERSIST_MAX_RETRY_DELAY)
+            self._stopping.wait(delay * random.uniform(0.5, 1.5))
+
+    def pending_count(self):
+        """Number of rows queued or spooled but not yet stored"""
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, timeout=10.0):
+        """Wait up to timeout seconds for every pending row to be stored; returns True when all were"""
+        deadline = time.monotonic() + timeout
+        while self.pending_count() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return not self.pending_count()
+
+    def stop(self, timeout=10.0):
+        """Store what is pending, then stop the worker; anything left stays in the spool"""
+        self.flush(timeout)
+        self._stopping.set()
+        self._thread.join(timeout=1.0)
+
+
+_lock = threading.Lock()
+_writer = None
+
+
+def get_writer():
+    """Return the process-wide write-behind writer, replaying the spool on first use"""
+    global _writer
+    with _lock:
+        if _writer is None:
+            _writer = WriteBehindWriter()
+            atexit.register(_writer.stop)
+        return _writer
+
+
+def save_chat_async(user_id, question, answer):
+    """Queue a chat exchange for storage"""
+    return get_writer().submit('chat', {'user_id': user_id, 'question': question, 'answer': answer})
+
+
+def save_emotional_diary_entry_async(user_id, entry, response, mood, json_data):
+    """Queue a diary entry for storage"""
+    return get_writer().submit('diary', {
+        'user_id': user_id,
+        'entry': entry,
+        'response': response,
+        'mood': mood,
+        'json_data': json_data
+    })
@@ -0,0 +1,113 @@
+# prompt_builder.py
+
+import os
+import threading
+import metrics
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Token budget for the conversation context of a single prompt
+PROMPT_CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", "768"))
+# Longest a single past turn may be before it is truncated
+PROMPT_TURN_TOKENS = int(os.getenv("PROMPT_TURN_TOKENS", "256"))
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+
+EMPTY_CONTEXT = "No previous context"
+TRUNCATION_MARKER = " [...]"
+
+_encoding = None
+# Set once loading the encoding has failed, so later calls go straight to the estimate
+_encoding_failed = False
+_encoding_lock = threading.Lock()
+
+
+def get_encoding():
+    """Return the tiktoken encoding, or None to fall back to the character estimate.
+
+    Loading is attempted once per process; after a failure (e.g. no network to fetch the
+    BPE file) every call returns None without trying again.
+    """
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed and tiktoken is not None:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+                except Exception as e:
+                    _encoding_failed = True
+                    metrics.increment("tokenizer_load_failures")
+                    print(f"Error loading tokenizer, estimating token counts: {e}")
+    return _encoding
+
+
+def count_tokens(text):
+    """Count the tokens in text (about four characters per token without tiktoken)"""
+    text = str(text or "")
+    encoding = get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text down to at most max_tokens tokens, marking where it was cut"""
+    text = str(text or "")
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    keep = max(max_tokens - count_tokens(TRUNCATION_MARKER), 0)
+    encoding = get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:keep]) + TRUNCATION_MARKER
+    return text[:keep * 4] + TRUNCATION_MARKER
+
+
+def format_turn(turn, fields, max_tokens=PROMPT_TURN_TOKENS):
+    """Format one past exchange, sharing max_tokens between its fields"""
+    per_field = max_tokens // len(fields)
+    lines = [f"{label}: {truncate_to_tokens(turn.get(key), per_field)}" for label, key in fields]
+    return "\n".join(lines) + "\n\n"
+
+
+def build_context(history, fields, budget=PROMPT_CONTEXT_TOKENS, max_turn_tokens=PROMPT_TURN_TOKENS, prefix=None):
+    """Greedily pack past turns into at most budget tokens, returning (text, token count).
+
+    Turns are taken best match first when rows carry a similarity score, newest first
+    otherwise, and the ones that fit are written out in their original order. A prefix
+    (such as a summary of older conversation) always comes first and counts against budget.
+    """
+    prefix_text = f"{prefix}\n\n" if prefix else ""
+    used = count_tokens(prefix_text) if prefix_text else 0
+    history = history or []
+
+    order = list(range(len(history)))
+    if history and all('similarity' in turn for turn in history):
+        order.sort(key=lambda i: history[i]['similarity'], reverse=True)
+    else:
+        order.reverse()
+
+    selected = {}
+    for i in order:
+        text = format_turn(history[i], fields, max_turn_tokens)
+        tokens = count_tokens(text)
+        if used + tokens > budget:
+            continue
+        selected[i] = text
+        used += tokens
+
+    if not prefix_text and not selected:
+        return EMPTY_CONTEXT, count_tokens(EMPTY_CONTEXT)
+    return prefix_text + "".join(selected[i] for i in sorted(selected)), used
+
+
+def record_prompt_tokens(name, prompt_template, inputs):
+    """Count the tokens of the fully formatted prompt and record them under {name}_prompt_tokens"""
+    try:
+        tokens = count_tokens(prompt_template.format(**inputs))
+    except Exception:
+        tokens = sum(count_tokens(value) for value in inputs.values())
+    metrics.observe(f"{name}_prompt_tokens", tokens)
+    return tokens
@@ -0,0 +1,161 @@
+# response_cache.py
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import metrics
+from embeddings import embed_texts
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+# Near-duplicate lookups embed the question; set to 0 to only serve exact (normalized) matches
+RESPONSE_CACHE_SEMANTIC = os.getenv("RESPONSE_CACHE_SEMANTIC", "1") == "1"
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.92"))
+# A past turn at least this similar to the question makes it a follow-up, answered with context and not cached
+RESPONSE_CACHE_CONTEXT_SIMILARITY = float(os.getenv("RESPONSE_CACHE_CONTEXT_SIMILARITY", "0.35"))
+
+# Questions that lean on earlier conversation or quote the user's own readings get a personal answer
+PERSONAL_CONTEXT_PATTERN = re.compile(
+    r"\b(you said|you told|you mentioned|earlier|last time|previous(ly)?|again|as discussed|remember|"
+    r"follow[- ]?up|my (results?|readings?|report|levels?|dose|dosage))\b|\bmy\b.*\d",
+    re.IGNORECASE
+)
+
+
+def normalize_question(question):
+    """Lower-case a question and strip punctuation and extra whitespace"""
+    return " ".join(re.sub(r"[^\w\s]", " ", str(question or "").lower()).split())
+
+
+def conditions_key(medical_conditions):
+    """Turn format_medical_conditions output into an order-independent key"""
+    if isinstance(medical_conditions, str):
+        medical_conditions = medical_conditions.split(",")
+    return tuple(sorted({c.strip().lower() for c in medical_conditions if c and c.strip()}))
+
+
+def needs_personal_context(question):
+    """Whether the answer depends on the user's own conversation, so must not be shared"""
+    return bool(PERSONAL_CONTEXT_PATTERN.search(str(question or "")))
+
+
+def has_relevant_context(history, threshold=RESPONSE_CACHE_CONTEXT_SIMILARITY):
+    """Whether any retrieved past turn bears on the question.
+
+    Rows without a similarity score (the recent-turns fallback) cannot be ruled out, so they count.
+    """
+    return any(row.get('similarity', 1.0) >= threshold for row in history or [])
+
+
+class ResponseCache:
+    """LRU cache of chat answers keyed by normalized question and sorted medical conditions.
+
+    Entries expire after ttl seconds; when semantic is on, a miss falls back to the most
+    similar cached question for the same conditions above the similarity threshold.
+    """
+
+    def __init__(self, max_size=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL,
+                 semantic=RESPONSE_CACHE_SEMANTIC, similarity=RESPONSE_CACHE_SIMILARITY):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.semantic = semantic
+        self.similarity = similarity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _embed(self, question):
+        """Return the normalized embedding of a question, or None when embeddings are unavailable"""
+        if not self.semantic:
+            return None
+        try:
+            vector = np.asarray(embed_texts([question])[0], dtype=np.float32)
+        except Exception as e:
+            print(f"Semantic response cache disabled: {e}")
+            self.semantic = False
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expire(self, now):
+        for key in [key for key, entry in self._entries.items() if entry['expires'] <= now]:
+            del self._entries[key]
+
+    def get(self, question, medical_conditions):
+        """Return a cached answer for the question, or None, recording hit/miss metrics"""
+        key = (normalize_question(question), conditions_key(medical_conditions))
+        with self._lock:
+            self._expire(time.monotonic())
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            candidates = [(k, e) for k, e in self._entries.items()
+                          if k[1] == key[1] and e['embedding'] is not None] if entry is None else []
+
+        if entry is None and candidates:
+            query = self._embed(question)
+            if query is not None:
+                scores = np.vstack([e['embedding'] for _, e in candidates]) @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity:
+                    entry = candidates[best][1]
+                    metrics.increment("response_cache_semantic_hits")
+                    with self._lock:
+                        if candidates[best][0] in self._entries:
+                            self._entries.move_to_end(candidates[best][0])
+
+        if entry is None:
+            metrics.increment("response_cache_misses")
+            return None
+        metrics.increment("response_cache_hits")
+        metrics.observe("response_cache_latency_saved", entry['generation_seconds'])
+        return entry['answer']
+
+    def set(self, question, medical_conditions, answer, generation_seconds=0.0):
+        """Cache an answer along with how long it took to generate"""
+        key = (normalize_question(question), conditions_key(medical_conditions))
+        entry = {
+            'answer': answer,
+            'generation_seconds': generation_seconds,
+            'embedding': self._embed(question),
+            'expires': time.monotonic() + self.ttl
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters, the hit ratio and the number of cached answers"""
+        hits = metrics.get_counter("response_cache_hits")
+        misses = metrics.get_counter("response_cache_misses")
+        with self._lock:
+            size = len(self._entries)
+        return {
+            'hits': hits,
+            'semantic_hits': metrics.get_counter("response_cache_semantic_hits"),
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+            'entries': size
+        }
+
+
+_lock = threading.Lock()
+_response_cache = None
+
+
+def get_response_cache():
+    """Return the process-wide response cache"""
+    global _response_cache
+    with _lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
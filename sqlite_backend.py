@@ -0,0 +1,473 @@
+# sqlite_backend.py
+
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+import numpy as np
+from embeddings import parse_vector
+
+# Tables from SupbaseSchema.txt plus user_documents. uuid/timestamp defaults are filled in
+# by the client, since SQLite has no gen_random_uuid() or microsecond now().
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users1 (
+  id TEXT PRIMARY KEY,
+  email TEXT NOT NULL UNIQUE,
+  password_hash TEXT NOT NULL,
+  full_name TEXT NOT NULL,
+  age INTEGER NOT NULL,
+  gender TEXT NOT NULL,
+  contact_no TEXT NOT NULL,
+  created_at TEXT,
+  embedding TEXT
+);
+CREATE TABLE IF NOT EXISTS medical_info (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL REFERENCES users1(id),
+  condition_name TEXT NOT NULL,
+  condition_type TEXT NOT NULL,
+  created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS medicalinfo (
+  content TEXT,
+  user_id TEXT REFERENCES users1(id),
+  content_hash TEXT,
+  created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS chat_history (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL REFERENCES users1(id),
+  question TEXT NOT NULL,
+  answer TEXT NOT NULL,
+  created_at TEXT,
+  metadata TEXT,
+  question_embedding TEXT,
+  answer_embedding TEXT
+);
+CREATE TABLE IF NOT EXISTS emotional_diary (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL REFERENCES users1(id),
+  entry TEXT NOT NULL,
+  response TEXT NOT NULL,
+  mood TEXT NOT NULL,
+  json_data TEXT,
+  created_at TEXT,
+  entry_embedding TEXT,
+  response_embedding TEXT
+);
+CREATE TABLE IF NOT EXISTS mood_daily_rollup (
+  user_id TEXT NOT NULL REFERENCES users1(id),
+  day TEXT NOT NULL,
+  entry_count INTEGER NOT NULL DEFAULT 0,
+  mood_value_sum INTEGER NOT NULL DEFAULT 0,
+  mood_counts TEXT NOT NULL DEFAULT '{}',
+  hour_counts TEXT NOT NULL DEFAULT '{}',
+  hour_sums TEXT NOT NULL DEFAULT '{}',
+  PRIMARY KEY (user_id, day)
+);
+CREATE TABLE IF NOT EXISTS conversation_summaries (
+  user_id TEXT PRIMARY KEY REFERENCES users1(id),
+  summary TEXT NOT NULL DEFAULT '',
+  turns_summarized INTEGER NOT NULL DEFAULT 0,
+  last_created_at TEXT,
+  last_chat_id TEXT,
+  updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS user_documents (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL REFERENCES users1(id),
+  file_name TEXT,
+  extracted_text TEXT,
+  summary TEXT,
+  medicines TEXT,
+  created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS chat_history_user_created_idx ON chat_history (user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS emotional_diary_user_created_idx ON emotional_diary (user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS medical_info_user_idx ON medical_info (user_id);
+DROP INDEX IF EXISTS medicalinfo_user_hash_idx;
+CREATE UNIQUE INDEX IF NOT EXISTS medicalinfo_user_hash_key ON medicalinfo (user_id, content_hash);
+CREATE INDEX IF NOT EXISTS user_documents_user_created_idx ON user_documents (user_id, created_at);
+"""
+
+# Columns holding jsonb in Postgres; stored as JSON text here and decoded on the way out
+JSON_COLUMNS = {'metadata', 'json_data', 'mood_counts', 'hour_counts', 'hour_sums', 'medicines'}
+# Columns holding pgvector values; returned as '[...]' strings, as PostgREST does
+VECTOR_COLUMNS = {'embedding', 'question_embedding', 'answer_embedding', 'entry_embedding', 'response_embedding'}
+
+# match_* function -> (table, embedding column searched, columns returned)
+MATCH_FUNCTIONS = {
+    'match_chat_history': ('chat_history', 'question_embedding', ['id', 'question', 'answer', 'created_at']),
+    'match_emotional_diary': ('emotional_diary', 'entry_embedding', ['id', 'entry', 'response', 'mood', 'created_at']),
+}
+
+FILTER_OPS = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _column(name):
+    """Quote a column name after checking it is a plain identifier"""
+    name = name.strip()
+    if not IDENTIFIER.match(name):
+        raise ValueError(f"Invalid column name: {name!r}")
+    return f'"{name}"'
+
+
+def _encode(column, value):
+    if column in JSON_COLUMNS and value is not None and not isinstance(value, str):
+        return json.dumps(value)
+    if column in VECTOR_COLUMNS and value is not None and not isinstance(value, str):
+        return json.dumps([float(x) for x in value])
+    return value
+
+
+def _decode(row):
+    row = dict(row)
+    for column in JSON_COLUMNS.intersection(row):
+        if isinstance(row[column], str):
+            try:
+                row[column] = json.loads(row[column])
+            except ValueError:
+                pass
+    return row
+
+
+def _split_top_level(text):
+    """Split a PostgREST logic string on commas that are not inside parentheses or quotes"""
+    parts, depth, quoted, current = [], 0, False, ''
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        if char == ',' and depth == 0 and not quoted:
+            parts.append(current)
+            current = ''
+        else:
+            current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _parse_logic(text):
+    """Turn a PostgREST or()/and() filter string into (sql, params)"""
+    clauses, params = [], []
+    for part in _split_top_level(text):
+        part = part.strip()
+        match = re.match(r'^(and|or)\((.*)\)$', part)
+        if match:
+            sql, sub_params = _parse_logic(match.group(2))
+            joiner = ' AND ' if match.group(1) == 'and' else ' OR '
+            clauses.append('(' + joiner.join(sql) + ')')
+            params.extend(sub_params)
+            continue
+        column, op, value = part.split('.', 2)
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        if len(value) >= 2 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+        clauses.append(f'{_column(column)} {FILTER_OPS[op]} ?')
+        params.append(value)
+    return clauses, params
+
+
+class SQLiteResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class SQLiteQuery:
+    """The subset of the postgrest-py query builder that SupabaseClient uses, over SQLite"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = _column(table)
+        self.table_name = table
+        self.action = 'select'
+        self.columns = '*'
+        self.count = None
+        self.head = False
+        self.payload = None
+        self.on_conflict = None
+        self.ignore_duplicates = False
+        self.where = []
+        self.params = []
+        self.order_by = []
+        self.row_limit = None
+
+    def select(self, columns='*', count=None, head=False):
+        self.action = 'select'
+        self.columns = columns
+        self.count = count
+        self.head = head
+        return self
+
+    def insert(self, rows):
+        self.action, self.payload = 'insert', rows
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False):
+        self.action, self.payload = 'upsert', rows
+        self.on_conflict = on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, data):
+        self.action, self.payload = 'update', data
+        return self
+
+    def delete(self):
+        self.action = 'delete'
+        return self
+
+    def _filter(self, column, op, value):
+        self.where.append(f'{_column(column)} {FILTER_OPS[op]} ?')
+        self.params.append(_encode(column, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column, value):
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column, value):
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column, value):
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column, value):
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column, value):
+        return self._filter(column, 'lte', value)
+
+    def in_(self, column, values):
+        values = list(values)
+        self.where.append(f'{_column(column)} IN ({", ".join("?" * len(values))})')
+        self.params.extend(values)
+        return self
+
+    def or_(self, filters):
+        clauses, params = _parse_logic(filters)
+        self.where.append('(' + ' OR '.join(clauses) + ')')
+        self.params.extend(params)
+        return self
+
+    def order(self, column, desc=False):
+        self.order_by.append(f'{_column(column)} {"DESC" if desc else "ASC"}')
+        return self
+
+    def limit(self, count):
+        self.row_limit = int(count)
+        return self
+
+    def _where_sql(self):
+        return f' WHERE {" AND ".join(self.where)}' if self.where else ''
+
+    def _select(self, connection):
+        columns = '*' if self.columns.strip() == '*' else ', '.join(
+            _column(c) for c in self.columns.split(','))
+        sql = f'SELECT {columns} FROM {self.table}{self._where_sql()}'
+        if self.order_by:
+            sql += ' ORDER BY ' + ', '.join(self.order_by)
+        if self.row_limit is not None:
+            sql += f' LIMIT {self.row_limit}'
+        return connection.execute(sql, self.params).fetchall()
+
+    def _insert(self, connection, table_columns):
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        saved = []
+        for row in rows:
+            row = dict(row)
+            if 'id' in table_columns and not row.get('id'):
+                row['id'] = str(uuid.uuid4())
+            if 'created_at' in table_columns and not row.get('created_at'):
+                row['created_at'] = _now()
+            columns = list(row)
+            sql = (f'INSERT INTO {self.table} ({", ".join(_column(c) for c in columns)}) '
+                   f'VALUES ({", ".join("?" * len(columns))})')
+            if self.action == 'upsert':
+                conflict_columns = [c.strip() for c in (self.on_conflict or 'id').split(',')]
+                conflict = ', '.join(_column(c) for c in conflict_columns)
+                updates = [c for c in columns if c not in conflict_columns]
+                if self.ignore_duplicates or not updates:
+                    sql += f' ON CONFLICT ({conflict}) DO NOTHING'
+                else:
+                    sql += f' ON CONFLICT ({conflict}) DO UPDATE SET ' + ', '.join(
+                        f'{_column(c)} = excluded.{_column(c)}' for c in updates)
+            saved.extend(connection.execute(sql + ' RETURNING *', [_encode(c, row[c]) for c in columns]).fetchall())
+        return saved
+
+    def execute(self):
+        table_columns = self.client.table_columns(self.table_name)
+        count = None
+        with self.client.transaction() as connection:
+            if self.action == 'select':
+                if self.count:
+                    count = connection.execute(f'SELECT COUNT(*) FROM {self.table}{self._where_sql()}',
+                                               self.params).fetchone()[0]
+                rows = [] if self.head else self._select(connection)
+            elif self.action in ('insert', 'upsert'):
+                rows = self._insert(connection, table_columns)
+            elif self.action == 'update':
+                columns = list(self.payload)
+                sql = (f'UPDATE {self.table} SET {", ".join(f"{_column(c)} = ?" for c in columns)}'
+                       f'{self._where_sql()} RETURNING *')
+                rows = connection.execute(sql, [_encode(c, self.payload[c]) for c in columns] + self.params).fetchall()
+            else:
+                rows = connection.execute(f'DELETE FROM {self.table}{self._where_sql()} RETURNING *',
+                                          self.params).fetchall()
+        return SQLiteResponse([_decode(row) for row in rows], count)
+
+
+# SQL bodies of the Postgres functions that write, with the same named parameters
+SQL_FUNCTIONS = {
+    # One upsert, so concurrent diary saves and deletes for a day cannot lose each other's counts;
+    # keys whose count drops to zero are removed, as mood_rollups.add_entry_to_rollup does
+    'apply_mood_rollup': """
+        INSERT INTO mood_daily_rollup (user_id, day, entry_count, mood_value_sum, mood_counts, hour_counts, hour_sums)
+        VALUES (:p_user_id, :p_day, :p_sign, :p_sign * :p_value, json_object(:p_mood, :p_sign),
+                json_object(:p_hour, :p_sign), json_object(:p_hour, :p_sign * :p_value))
+        ON CONFLICT (user_id, day) DO UPDATE SET
+          entry_count = entry_count + excluded.entry_count,
+          mood_value_sum = mood_value_sum + excluded.mood_value_sum,
+          mood_counts = CASE
+            WHEN coalesce(json_extract(mood_counts, '$."' || :p_mood || '"'), 0) + :p_sign = 0
+              THEN json_remove(mood_counts, '$."' || :p_mood || '"')
+            ELSE json_set(mood_counts, '$."' || :p_mood || '"',
+                          coalesce(json_extract(mood_counts, '$."' || :p_mood || '"'), 0) + :p_sign) END,
+          hour_counts = CASE
+            WHEN coalesce(json_extract(hour_counts, '$."' || :p_hour || '"'), 0) + :p_sign = 0
+              THEN json_remove(hour_counts, '$."' || :p_hour || '"')
+            ELSE json_set(hour_counts, '$."' || :p_hour || '"',
+                          coalesce(json_extract(hour_counts, '$."' || :p_hour || '"'), 0) + :p_sign) END,
+          hour_sums = CASE
+            WHEN coalesce(json_extract(hour_sums, '$."' || :p_hour || '"'), 0) + :p_sign * :p_value = 0
+              THEN json_remove(hour_sums, '$."' || :p_hour || '"')
+            ELSE json_set(hour_sums, '$."' || :p_hour || '"',
+                          coalesce(json_extract(hour_sums, '$."' || :p_hour || '"'), 0) + :p_sign * :p_value) END
+    """,
+}
+
+
+class SQLiteRPC:
+    """Python implementations of the Postgres functions SupabaseClient calls"""
+
+    def __init__(self, client, name, params):
+        if name not in MATCH_FUNCTIONS and name not in SQL_FUNCTIONS:
+            raise ValueError(f"Unknown function: {name}")
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        if self.name in SQL_FUNCTIONS:
+            with self.client.transaction() as connection:
+                connection.execute(SQL_FUNCTIONS[self.name], self.params)
+            return SQLiteResponse([])
+
+        table, embedding_column, columns = MATCH_FUNCTIONS[self.name]
+        query = parse_vector(self.params['query_embedding'])
+        rows = self.client.table(table).select(', '.join(columns + [embedding_column])).eq(
+            'user_id', self.params['p_user_id']).execute().data
+        rows = [row for row in rows if row.get(embedding_column)]
+        if not rows or query is None:
+            return SQLiteResponse([])
+
+        matrix = np.vstack([parse_vector(row.pop(embedding_column)) for row in rows])
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+        scores = (matrix @ query) / np.where(norms == 0, 1.0, norms)
+        top = np.argsort(-scores)[:self.params['match_count']]
+        return SQLiteResponse([dict(rows[i], similarity=float(scores[i])) for i in top])
+
+
+class SQLiteClient:
+    """Drop-in for supabase.Client backed by a local SQLite file (needs SQLite 3.35+ for RETURNING).
+
+    With a file, each thread gets its own connection and WAL mode lets reads run alongside a
+    write. ':memory:' uses one connection that all threads take turns on.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._columns = {}
+        self._shared = self._connect() if path == ':memory:' else None
+        self._shared_lock = threading.RLock()
+        self.connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    @property
+    def connection(self):
+        if self._shared is not None:
+            return self._shared
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        """Run a group of statements as one transaction on this thread's connection"""
+        lock = self._shared_lock if self._shared is not None else nullcontext()
+        with lock:
+            connection = self.connection
+            connection.execute('BEGIN')
+            try:
+                yield connection
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+
+    def table_columns(self, table):
+        """Return the set of column names of a table"""
+        if table not in self._columns:
+            with self.transaction() as connection:
+                rows = connection.execute(f'PRAGMA table_info({_column(table)})').fetchall()
+            self._columns[table] = {row['name'] for row in rows}
+        return self._columns[table]
+
+    def table(self, name):
+        return SQLiteQuery(self, name)
+
+    def rpc(self, name, params):
+        return SQLiteRPC(self, name, params)
+
+
+class SQLiteClientPool:
+    """Pool interface of SupabaseClientPool around a single SQLite client"""
+
+    def __init__(self, path, size=4):
+        self.size = max(1, size)
+        self.client = SQLiteClient(path)
+        self._lock = threading.Lock()
+        self.connections_reused = 0
+
+    def acquire(self):
+        with self._lock:
+            self.connections_reused += 1
+        return self.client
+
+    def stats(self):
+        with self._lock:
+            return {'size': self.size, 'open': 1, 'opened': 1, 'reused': self.connections_reused}
@@ -0,0 +1,21 @@
+# streaming.py
+
+import time
+import metrics
+
+
+def stream_to_placeholder(chain, inputs, placeholder, name):
+    """Stream a chain's output into a Streamlit placeholder and return the full text"""
+    started = time.perf_counter()
+    chunks = []
+
+    for chunk in chain.stream(inputs):
+        if not chunks:
+            metrics.record_timing(f"{name}_time_to_first_token", time.perf_counter() - started)
+        chunks.append(chunk)
+        placeholder.markdown("".join(chunks) + "▌")
+
+    response = "".join(chunks)
+    metrics.record_timing(f"{name}_generation", time.perf_counter() - started)
+    placeholder.markdown(response)
+    return response
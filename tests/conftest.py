@@ -0,0 +1,45 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import pytest
+
+# The app is a flat set of modules at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def fake_embed_texts(texts):
+    """Deterministic 8-dimensional stand-in for the sentence embedder"""
+    vectors = []
+    for text in texts:
+        vector = [0.0] * 8
+        for word in str(text).lower().split():
+            vector[sum(map(ord, word)) % 8] += 1.0
+        vectors.append(vector)
+    return vectors
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    """A SupabaseClient over a fresh SQLite file with two users, u1 and u2"""
+    import database
+    from database import SupabaseClient, UserCache
+    from sqlite_backend import SQLiteClientPool
+
+    monkeypatch.setattr(database, "embed_texts", fake_embed_texts)
+    db = SupabaseClient(SQLiteClientPool(str(tmp_path / "test.db")), UserCache(ttl=0))
+    for user_id in ('u1', 'u2'):
+        db.client.table('users1').insert({'id': user_id, 'email': f"{user_id}@example.com", 'password_hash': 'x',
+                                          'full_name': user_id, 'age': 40, 'gender': 'Other',
+                                          'contact_no': '0'}).execute()
+    return db
@@ -0,0 +1,53 @@
+# tests/test_conversation_summary.py
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+import conversation_summary
+
+
+class CountingChain:
+    """Summary chain that records each fold instead of calling the LLM"""
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, inputs):
+        self.calls.append(inputs)
+        return f"summary {len(self.calls)}"
+
+
+@pytest.fixture
+def chain(monkeypatch, sqlite_db):
+    counting = CountingChain()
+    monkeypatch.setattr(conversation_summary, "get_summary_chain", lambda: counting)
+    monkeypatch.setattr(conversation_summary, "get_db", lambda: sqlite_db)
+    return counting
+
+
+def save_turns(db, count):
+    db.save_chats([{'id': f"c{number:04d}", 'user_id': 'u1', 'question': f"question {number}", 'answer': "answer",
+                    'created_at': f"2025-01-01T09:{number // 60 % 60:02d}:{number % 60:02d}+00:00"}
+                   for number in range(count)])
+
+
+def test_a_long_first_backlog_is_folded_in_a_bounded_number_of_calls(sqlite_db, chain):
+    save_turns(sqlite_db, 400)
+
+    folded = conversation_summary.update_summary('u1', max_batches=2)
+
+    assert len(chain.calls) == 2
+    assert folded == 2 * conversation_summary.SUMMARY_EVERY_N_TURNS
+    row = sqlite_db.get_conversation_summary('u1')
+    newest_pending = 400 - conversation_summary.SUMMARY_RECENT_TURNS - 1
+    assert row['last_chat_id'] == f"c{newest_pending:04d}"
+    assert row['turns_summarized'] == newest_pending + 1
+
+
+def test_the_next_update_starts_after_the_skipped_backlog(sqlite_db, chain):
+    save_turns(sqlite_db, 400)
+    conversation_summary.update_summary('u1', max_batches=2)
+
+    assert conversation_summary.update_summary('u1', max_batches=2) == 0
+    assert len(chain.calls) == 2
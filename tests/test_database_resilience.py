@@ -0,0 +1,156 @@
+# tests/test_database_resilience.py
+
+import sqlite3
+import time
+
+import pytest
+from postgrest.exceptions import APIError
+
+import database
+from database import DatabaseReadError, DatabaseWriteError, error_kind
+from fault_injection import make_client
+
+
+@pytest.fixture(autouse=True)
+def short_deadlines(monkeypatch):
+    monkeypatch.setattr(database, "DB_READ_TIMEOUT", 0.5)
+    monkeypatch.setattr(database, "DB_WRITE_TIMEOUT", 0.5)
+    monkeypatch.setattr(database, "DB_RETRY_DELAY", 0.01)
+
+
+def test_a_transient_read_failure_is_retried():
+    db, injector = make_client()
+    injector.fail_next(1)
+
+    assert db.get_user_by_id('u1')['email'] == 'asha@example.com'
+    assert injector.calls == 2
+    assert not db.errors
+
+
+def test_last_good_is_served_only_while_the_breaker_is_open():
+    db, injector = make_client(failure_threshold=3)
+    primed = db.get_chat_history('u1')
+    injector.mode = 'down'
+
+    assert db.get_chat_history('u1') == primed
+    assert db.breaker.state == 'open'
+    assert db.last_error['served_stale']
+
+    calls = injector.calls
+    assert db.get_chat_history('u1') == primed
+    assert injector.calls == calls
+
+
+def test_a_failure_with_the_breaker_closed_returns_the_default_not_stale_data():
+    db, injector = make_client(failure_threshold=10)
+    db.get_chat_history('u1')
+    injector.mode = 'down'
+
+    assert db.get_chat_history('u1') == []
+    assert db.breaker.state == 'closed'
+    assert not db.last_error['served_stale']
+
+
+def test_a_failed_email_lookup_raises_instead_of_reporting_no_user():
+    db, injector = make_client()
+    assert db.get_user_by_email('asha@example.com') is not None
+    injector.mode = 'down'
+
+    with pytest.raises(DatabaseReadError) as raised:
+        db.get_user_by_email('asha@example.com')
+    assert raised.value.operation == 'get_user_by_email'
+    assert db.breaker.state == 'open'
+
+    # No last-good copy for strict reads, even while the breaker is open
+    with pytest.raises(DatabaseReadError):
+        db.get_user_by_email('asha@example.com')
+
+
+def test_a_hanging_read_is_bounded_by_its_timeout():
+    db, injector = make_client()
+    injector.mode, injector.hang_seconds = 'hang', 2.0
+
+    started = time.monotonic()
+    assert db.get_user_by_id('u1') is None
+    assert time.monotonic() - started < 1.5
+    assert db.last_error['error_type'] == 'OperationTimeout'
+
+
+def test_the_breaker_lets_a_trial_through_and_closes_after_recovery():
+    db, injector = make_client(reset_seconds=0.2)
+    injector.mode = 'down'
+    db.get_chat_history('u1')
+    assert db.breaker.state == 'open'
+
+    injector.mode = 'ok'
+    time.sleep(0.25)
+    assert db.get_chat_history('u1')
+    assert db.breaker.state == 'closed'
+
+
+def test_history_pages_are_retried_and_fail_loudly():
+    db, injector = make_client()
+    injector.fail_next(1)
+    assert [row['id'] for row in db.iter_chat_history('u1')] == ['c1']
+
+    injector.mode = 'down'
+    with pytest.raises(DatabaseReadError):
+        list(db.iter_chat_history('u1'))
+
+
+def test_writes_are_not_retried():
+    db, injector = make_client()
+    injector.fail_next(1)
+
+    assert not db.update_user('u1', {'full_name': 'Asha R'})
+    assert injector.calls == 1
+
+
+def test_a_rejected_read_fails_once_without_counting_toward_the_breaker():
+    db, injector = make_client(failure_threshold=1)
+    injector.reject_next(1)
+
+    assert db.get_chat_history('u1') == []
+    assert injector.calls == 1
+    assert db.breaker.state == 'closed'
+    assert db.last_error['error_kind'] == 'permanent'
+
+
+def test_rejected_writes_do_not_open_the_breaker_for_everyone(sqlite_db):
+    for number in range(10):
+        row = {'id': f"bad-{number}", 'user_id': 'u1', 'question': "q", 'answer': None}
+        assert sqlite_db.save_chats([row]) is None
+
+    assert sqlite_db.breaker.state == 'closed'
+    assert sqlite_db.last_error['error_kind'] == 'permanent'
+    assert sqlite_db.get_user_by_id('u1')['id'] == 'u1'
+
+
+def test_a_strict_write_reports_the_error_kind():
+    db, injector = make_client()
+    injector.reject_next(1)
+    with pytest.raises(DatabaseWriteError) as rejected:
+        db._write('update_user', lambda: db.client.table('users1').update({}).execute(), strict=True)
+    assert rejected.value.kind == 'permanent'
+
+    injector.fail_next(1)
+    with pytest.raises(DatabaseWriteError) as failed:
+        db._write('update_user', lambda: db.client.table('users1').update({}).execute(), strict=True)
+    assert failed.value.kind == 'transient'
+
+
+@pytest.mark.parametrize("error, kind", [
+    (database.OperationTimeout("slow"), 'transient'),
+    (ConnectionError("reset"), 'transient'),
+    (sqlite3.OperationalError("database is locked"), 'transient'),
+    (sqlite3.IntegrityError("NOT NULL constraint failed"), 'permanent'),
+    (sqlite3.OperationalError("no such column: bogus"), 'permanent'),
+    (APIError({'code': '23505', 'message': 'duplicate key'}), 'permanent'),
+    (APIError({'code': 'PGRST202', 'message': 'function not found'}), 'permanent'),
+    (APIError({'code': '57014', 'message': 'statement timeout'}), 'transient'),
+    (APIError({'code': 'PGRST001', 'message': 'connection failed'}), 'transient'),
+    (APIError({'code': 503, 'message': 'JSON could not be generated'}), 'transient'),
+    (ValueError("bad filter"), 'permanent'),
+])
+def test_errors_are_sorted_into_transient_and_permanent(error, kind):
+    assert error_kind(error) == kind
@@ -0,0 +1,50 @@
+# tests/test_embeddings.py
+
+import pytest
+
+import embeddings
+import metrics
+from embeddings import EmbedderUnavailable
+
+
+class FailingLoader:
+    """TextEmbedder stand-in whose model cannot be loaded"""
+
+    def __init__(self):
+        self.attempts = 0
+
+    def __call__(self):
+        self.attempts += 1
+        raise OSError("model files not found")
+
+
+@pytest.fixture
+def failing_loader(monkeypatch):
+    loader = FailingLoader()
+    monkeypatch.setattr(embeddings, "TextEmbedder", loader)
+    monkeypatch.setattr(embeddings, "_embedder", None)
+    monkeypatch.setattr(embeddings, "_load_failed_at", None)
+    return loader
+
+
+def test_a_failed_load_is_not_retried_during_the_cool_down(failing_loader, monkeypatch):
+    monkeypatch.setattr(embeddings, "EMBEDDING_RETRY_SECONDS", 60)
+
+    with pytest.raises(OSError):
+        embeddings.embed_texts(["first"])
+    for _ in range(3):
+        with pytest.raises(EmbedderUnavailable):
+            embeddings.embed_texts(["again"])
+
+    assert failing_loader.attempts == 1
+    assert metrics.get_counter("embedding_load_failures") == 1
+
+
+def test_loading_is_tried_again_once_the_cool_down_has_passed(failing_loader, monkeypatch):
+    monkeypatch.setattr(embeddings, "EMBEDDING_RETRY_SECONDS", 0)
+
+    for _ in range(2):
+        with pytest.raises(OSError):
+            embeddings.get_embedder()
+
+    assert failing_loader.attempts == 2
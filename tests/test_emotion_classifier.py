@@ -0,0 +1,50 @@
+# tests/test_emotion_classifier.py
+
+import pytest
+
+import emotion_classifier
+import metrics
+from emotion_classifier import ClassifierUnavailable
+
+
+class FailingLoader:
+    """LocalEmotionClassifier stand-in whose model cannot be downloaded"""
+
+    def __init__(self):
+        self.attempts = 0
+
+    def __call__(self):
+        self.attempts += 1
+        raise OSError("could not download the model")
+
+
+@pytest.fixture
+def failing_loader(monkeypatch):
+    loader = FailingLoader()
+    monkeypatch.setattr(emotion_classifier, "LocalEmotionClassifier", loader)
+    monkeypatch.setattr(emotion_classifier, "_classifier", None)
+    monkeypatch.setattr(emotion_classifier, "_load_failed_at", None)
+    return loader
+
+
+def test_a_failed_load_is_not_retried_during_the_cool_down(failing_loader, monkeypatch):
+    monkeypatch.setattr(emotion_classifier, "EMOTION_CLASSIFIER_RETRY_SECONDS", 60)
+
+    with pytest.raises(OSError):
+        emotion_classifier.get_local_classifier()
+    for _ in range(3):
+        with pytest.raises(ClassifierUnavailable):
+            emotion_classifier.get_local_classifier()
+
+    assert failing_loader.attempts == 1
+    assert metrics.get_counter("emotion_classifier_load_failures") == 1
+
+
+def test_loading_is_tried_again_once_the_cool_down_has_passed(failing_loader, monkeypatch):
+    monkeypatch.setattr(emotion_classifier, "EMOTION_CLASSIFIER_RETRY_SECONDS", 0)
+
+    for _ in range(2):
+        with pytest.raises(OSError):
+            emotion_classifier.get_local_classifier()
+
+    assert failing_loader.attempts == 2
@@ -0,0 +1,56 @@
+# tests/test_history_pagination.py
+
+import pytest
+
+
+@pytest.fixture
+def chats(sqlite_db):
+    """Seven chats for u1, three of them sharing one created_at, plus one chat for u2"""
+    stamps = ["2025-01-01T09:00:00", "2025-01-02T09:00:00", "2025-01-02T09:00:00", "2025-01-02T09:00:00",
+              "2025-01-03T09:00:00", "2025-01-04T09:00:00", "2025-01-05T09:00:00"]
+    rows = [{'id': f"c{number}", 'user_id': 'u1', 'question': f"question {number}", 'answer': "answer",
+             'created_at': created_at} for number, created_at in enumerate(stamps)]
+    rows.append({'id': "other", 'user_id': 'u2', 'question': "question", 'answer': "answer",
+                 'created_at': "2025-01-02T09:00:00"})
+    sqlite_db.save_chats(rows)
+    return [row['id'] for row in rows if row['user_id'] == 'u1']
+
+
+def all_pages(db, **kwargs):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = db.get_chat_history_page('u1', cursor=cursor, **kwargs)
+        pages.append([row['id'] for row in rows])
+        if cursor is None:
+            return pages
+
+
+def test_pages_cover_every_row_once_even_across_equal_timestamps(sqlite_db, chats):
+    pages = all_pages(sqlite_db, limit=2)
+
+    assert [row_id for page in pages for row_id in page] == chats
+    assert all(len(page) == 2 for page in pages[:-1])
+
+
+def test_descending_pages_run_newest_first(sqlite_db, chats):
+    pages = all_pages(sqlite_db, limit=3, descending=True)
+
+    assert [row_id for page in pages for row_id in page] == chats[::-1]
+
+
+def test_the_cursor_columns_are_projected_even_when_not_asked_for(sqlite_db, chats):
+    rows, cursor = sqlite_db.get_chat_history_page('u1', limit=2, columns='question')
+
+    assert {'question', 'created_at', 'id'} <= set(rows[0])
+    assert cursor == (rows[-1]['created_at'], rows[-1]['id'])
+
+
+def test_iteration_resumes_after_a_cursor(sqlite_db, chats):
+    first_page, cursor = sqlite_db.get_chat_history_page('u1', limit=3)
+
+    resumed = [row['id'] for row in sqlite_db.iter_chat_history('u1', page_size=2, cursor=cursor)]
+    assert [row['id'] for row in first_page] + resumed == chats
+
+
+def test_recent_history_is_the_latest_turns_oldest_first(sqlite_db, chats):
+    assert [row['id'] for row in sqlite_db.get_recent_chat_history('u1', limit=3)] == chats[-3:]
@@ -0,0 +1,42 @@
+# tests/test_image_preprocessing.py
+
+import io
+import os
+
+import pytest
+
+from image_preprocessing import PROFILES, document_type, normalize_upload
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "ocr")
+
+
+@pytest.mark.parametrize("filename, expected", [
+    ("lab_report_1.jpg", 'report'),
+    ("Lab-Results.png", 'report'),
+    ("blood_labs_2024.jpg", 'report'),
+    ("discharge_summary_2.jpg", 'report'),
+    ("prescription_3.jpg", 'prescription'),
+    ("label.jpg", 'default'),
+    ("syllabus.jpg", 'default'),
+    ("collaboration.png", 'default'),
+    ("IMG_0042.jpg", 'default'),
+])
+def test_document_type_matches_whole_words(filename, expected):
+    assert document_type(filename) == expected
+
+
+@pytest.mark.parametrize("filename", sorted(f for f in os.listdir(FIXTURE_DIR) if f.endswith(".jpg")))
+def test_fixture_photos_are_turned_upright_and_shrunk(filename):
+    Image = pytest.importorskip("PIL.Image")
+    pytest.importorskip("cv2")
+    with open(os.path.join(FIXTURE_DIR, filename), "rb") as photo:
+        content = photo.read()
+    assert os.path.exists(os.path.join(FIXTURE_DIR, os.path.splitext(filename)[0] + ".txt"))
+
+    new_name, normalized, content_type = normalize_upload(filename, content, "image/jpeg")
+
+    profile = PROFILES[document_type(filename)]
+    assert content_type == f"image/{profile['format'].lower()}"
+    assert len(normalized) < len(content)
+    image = Image.open(io.BytesIO(normalized))
+    assert image.mode == 'L' and image.height > image.width
@@ -0,0 +1,33 @@
+# tests/test_mood_frames.py
+
+import pytest
+
+mood_visualizations = pytest.importorskip("mood_visualizations")
+
+
+@pytest.fixture(autouse=True)
+def small_cache(monkeypatch):
+    monkeypatch.setattr(mood_visualizations, "MOOD_FRAME_CACHE_SIZE", 2)
+    mood_visualizations._mood_frames.clear()
+    yield
+    mood_visualizations._mood_frames.clear()
+
+
+def entries(count):
+    return [{'mood': 'happy', 'created_at': f"2025-01-{day + 1:02d}T09:00:00+00:00"} for day in range(count)]
+
+
+def test_unchanged_history_reuses_the_frame():
+    first = mood_visualizations.get_mood_frame('u1', entries(3))
+
+    assert mood_visualizations.get_mood_frame('u1', entries(3)) is first
+    assert mood_visualizations.get_mood_frame('u1', entries(4)) is not first
+
+
+def test_the_least_recently_viewed_user_is_dropped_when_full():
+    mood_visualizations.get_mood_frame('u1', entries(1))
+    mood_visualizations.get_mood_frame('u2', entries(1))
+    mood_visualizations.get_mood_frame('u1', entries(1))
+    mood_visualizations.get_mood_frame('u3', entries(1))
+
+    assert list(mood_visualizations._mood_frames) == ['u1', 'u3']
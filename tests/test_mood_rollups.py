@@ -0,0 +1,90 @@
+# tests/test_mood_rollups.py
+
+import threading
+
+import pytest
+
+from mood_rollups import build_rollups
+
+ENTRIES = [
+    {'mood': 'happy', 'created_at': '2025-03-01T08:15:00+00:00'},
+    {'mood': 'sad', 'created_at': '2025-03-01T21:40:00+00:00'},
+    {'mood': 'happy', 'created_at': '2025-03-02T09:05:00+00:00'},
+]
+
+
+def save_entries(db, entries, user_id='u1'):
+    rows = [dict(entry, id=f"e{i}", user_id=user_id, entry="Today", response="Thanks", json_data={})
+            for i, entry in enumerate(entries)]
+    return db.save_emotional_diary_entries(rows)
+
+
+def stored_rollups(db, user_id='u1'):
+    columns = ('day', 'entry_count', 'mood_value_sum', 'mood_counts', 'hour_counts', 'hour_sums')
+    return [{column: row[column] for column in columns} for row in db.get_mood_rollups(user_id)]
+
+
+def expected_rollups(entries, user_id='u1'):
+    return [{column: row[column] for column in row if column != 'user_id'} for row in build_rollups(user_id, entries)]
+
+
+def test_saving_entries_increments_their_days(sqlite_db):
+    save_entries(sqlite_db, ENTRIES)
+
+    assert stored_rollups(sqlite_db) == expected_rollups(ENTRIES)
+
+
+def test_deleting_an_entry_decrements_its_day_and_drops_zero_counts(sqlite_db):
+    save_entries(sqlite_db, ENTRIES)
+    assert sqlite_db.delete_emotional_diary_entry('e1')
+
+    assert stored_rollups(sqlite_db) == expected_rollups([ENTRIES[0], ENTRIES[2]])
+    first_day = stored_rollups(sqlite_db)[0]
+    assert 'sad' not in first_day['mood_counts'] and '21' not in first_day['hour_counts']
+
+
+def test_replayed_rows_are_not_counted_twice(sqlite_db):
+    save_entries(sqlite_db, ENTRIES)
+    save_entries(sqlite_db, ENTRIES)
+
+    assert stored_rollups(sqlite_db) == expected_rollups(ENTRIES)
+
+
+def test_concurrent_updates_to_one_day_are_not_lost(sqlite_db):
+    def record(count):
+        for _ in range(count):
+            sqlite_db.record_mood_rollup('u1', 'calm', '2025-03-05T10:00:00+00:00')
+
+    threads = [threading.Thread(target=record, args=(25,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    day = stored_rollups(sqlite_db)[0]
+    assert day['entry_count'] == 100
+    assert day['mood_counts'] == {'calm': 100}
+    assert day['hour_sums'] == {'10': 300}
+    assert not sqlite_db.errors
+
+
+def test_diary_entries_are_counted_without_fetching_them(sqlite_db):
+    save_entries(sqlite_db, ENTRIES)
+
+    assert sqlite_db.count_emotional_diary_entries('u1') == 3
+    assert sqlite_db.count_emotional_diary_entries('u2') == 0
+
+
+def test_a_lost_increment_is_repaired_when_the_count_disagrees(sqlite_db, monkeypatch):
+    mood_visualizations = pytest.importorskip("mood_visualizations")
+    save_entries(sqlite_db, ENTRIES[:2])
+    # The third entry is stored but its rollup RPC fails, as after a timeout or a lost connection
+    monkeypatch.setattr(sqlite_db, "record_mood_rollup", lambda *args, **kwargs: False)
+    save_entries(sqlite_db, ENTRIES)
+    assert sum(row['entry_count'] for row in stored_rollups(sqlite_db)) == 2
+
+    count = sqlite_db.count_emotional_diary_entries('u1')
+    mood_visualizations.load_mood_rollups(sqlite_db, 'u1', expected_count=count,
+                                          rollups=sqlite_db.get_mood_rollups('u1'))
+
+    assert stored_rollups(sqlite_db) == expected_rollups(ENTRIES)
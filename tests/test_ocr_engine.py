@@ -0,0 +1,69 @@
+# tests/test_ocr_engine.py
+
+import io
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import metrics
+import ocr_engine
+from ocr_engine import OCREngine, load_pages
+
+
+def make_pdf(pages):
+    pdfium = pytest.importorskip("pypdfium2")
+    pdf = pdfium.PdfDocument.new()
+    for _ in range(pages):
+        pdf.new_page(100, 100)
+    buffer = io.BytesIO()
+    pdf.save(buffer)
+    return buffer.getvalue()
+
+
+class FakePool:
+    """Stands in for the worker ProcessPoolExecutor"""
+
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.shut_down = False
+
+    def map(self, fn, pages, annotate):
+        if self.broken:
+            raise BrokenProcessPool("a worker process died")
+        return [{'text': f"page {i}", 'seconds': 0.0} for i, _ in enumerate(pages)]
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_pdf_pages_are_rendered_up_to_the_cap():
+    content = make_pdf(3)
+
+    assert len(load_pages(content, "scan.pdf", max_pages=3)) == 3
+    with pytest.raises(ValueError, match="3 pages"):
+        load_pages(content, "scan.pdf", max_pages=2)
+
+
+def test_a_broken_pool_is_replaced_and_the_document_retried(monkeypatch):
+    broken = FakePool(broken=True)
+    fresh = FakePool()
+    monkeypatch.setattr(ocr_engine, "ProcessPoolExecutor", lambda **kwargs: fresh)
+    monkeypatch.setattr(ocr_engine, "load_pages", lambda content, filename: ["first", "second"])
+    engine = OCREngine(workers=1, pretrained=False)
+    engine._pool = broken
+
+    result = engine.extract(b"image", "photo.png")
+
+    assert result['text'] == "page 0\n\npage 1"
+    assert broken.shut_down
+    assert engine._pool is fresh
+    assert metrics.get_counter("ocr_pool_restarts") == 1
+
+
+def test_annotate_page_returns_one_encoded_png():
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("cv2")
+    page = np.full((60, 120, 3), 255, dtype=np.uint8)
+    blocks = [{'text': "HbA1c", 'confidence': 97.5, 'bbox': {'x0': 10, 'y0': 20, 'x1': 60, 'y1': 35}}]
+
+    assert ocr_engine.annotate_page(page, blocks)[:8] == b"\x89PNG\r\n\x1a\n"
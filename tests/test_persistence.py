@@ -0,0 +1,180 @@
+# tests/test_persistence.py
+
+import json
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import persistence
+from database import DatabaseWriteError
+from persistence import WriteBehindWriter
+
+
+class FakeStore:
+    """Stands in for SupabaseClient.save_chats / save_emotional_diary_entries"""
+
+    def __init__(self):
+        self.rows = {}
+        self.down = False
+        self.delay = 0.0
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def save(self, kind, rows):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.down:
+            raise DatabaseWriteError('save_chats', ConnectionError("database unreachable"))
+        if any(row['user_id'] == 'missing-user' for row in rows):
+            raise DatabaseWriteError('save_chats', sqlite3.IntegrityError("FOREIGN KEY constraint failed"))
+        with self.lock:
+            for row in rows:
+                self.rows.setdefault(row['id'], row)
+        return rows
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = FakeStore()
+    monkeypatch.setattr(persistence, "_save_batch", store.save)
+    monkeypatch.setattr(persistence, "get_db", lambda: store)
+    monkeypatch.setattr(persistence, "PERSIST_RETRY_DELAY", 0.01)
+    monkeypatch.setattr(persistence, "PERSIST_MAX_RETRY_DELAY", 0.05)
+    return store
+
+
+def make_writer(tmp_path, **kwargs):
+    options = dict(spool_path=str(tmp_path / "spool.jsonl"), dead_letter_path=str(tmp_path / "dead.jsonl"),
+                   flush_interval=0.01)
+    options.update(kwargs)
+    return WriteBehindWriter(**options)
+
+
+def chat_row(user_id='u1', number=0):
+    return {'user_id': user_id, 'question': f"question {number}", 'answer': "answer"}
+
+
+def test_rows_are_stored_in_the_background(store, tmp_path):
+    writer = make_writer(tmp_path)
+    ids = [writer.submit('chat', chat_row(number=i)) for i in range(5)]
+
+    assert writer.flush(timeout=2)
+    writer.stop()
+    assert set(store.rows) == set(ids)
+
+
+def test_unsaved_rows_are_replayed_once_after_a_restart(store, tmp_path):
+    store.down = True
+    writer = make_writer(tmp_path)
+    ids = [writer.submit('chat', chat_row(number=i)) for i in range(3)]
+    writer.stop(timeout=0.2)
+    assert writer.pending_count() == 3
+
+    store.down = False
+    replayed = make_writer(tmp_path)
+    assert replayed.flush(timeout=2)
+    replayed.stop()
+    assert set(store.rows) == set(ids)
+
+    # Everything is logged as stored, so a third start has nothing to replay
+    third = make_writer(tmp_path)
+    assert third.pending_count() == 0
+    third.stop()
+
+
+def test_stored_rows_are_logged_instead_of_rewriting_the_spool(store, tmp_path):
+    writer = make_writer(tmp_path, compact_every=100)
+    ids = [writer.submit('chat', chat_row(number=i)) for i in range(4)]
+    assert writer.flush(timeout=2)
+    writer.stop()
+
+    spooled = [json.loads(line)['row']['id'] for line in (tmp_path / "spool.jsonl").read_text().splitlines()]
+    saved = (tmp_path / "spool.jsonl.saved").read_text().split()
+    assert spooled == ids
+    assert sorted(saved) == sorted(ids)
+
+
+def test_spool_is_compacted_after_compact_every_rows(store, tmp_path):
+    writer = make_writer(tmp_path, compact_every=3)
+    for i in range(3):
+        writer.submit('chat', chat_row(number=i))
+    assert writer.flush(timeout=2)
+    writer.stop()
+
+    assert (tmp_path / "spool.jsonl").read_text() == ""
+    assert (tmp_path / "spool.jsonl.saved").read_text() == ""
+
+
+def test_a_rejected_row_does_not_block_later_rows_and_is_dead_lettered(store, tmp_path):
+    writer = make_writer(tmp_path, max_attempts=2)
+    poison = writer.submit('chat', chat_row(user_id='missing-user'))
+    good = []
+    for wave in range(3):
+        good.append(writer.submit('chat', chat_row(number=wave)))
+        time.sleep(0.1)
+
+    assert writer.flush(timeout=3)
+    writer.stop()
+    assert set(store.rows) == set(good)
+    dead = [json.loads(line) for line in (tmp_path / "dead.jsonl").read_text().splitlines()]
+    assert [job['row']['id'] for job in dead] == [poison]
+
+    restarted = make_writer(tmp_path)
+    assert restarted.pending_count() == 0
+    restarted.stop()
+
+
+def test_a_lone_rejected_row_is_dead_lettered(store, tmp_path):
+    writer = make_writer(tmp_path, max_attempts=3)
+    poison = writer.submit('chat', chat_row(user_id='missing-user'))
+
+    assert writer.flush(timeout=3)
+    writer.stop()
+    dead = [json.loads(line) for line in (tmp_path / "dead.jsonl").read_text().splitlines()]
+    assert [(job['row']['id'], job['attempts']) for job in dead] == [(poison, 3)]
+    assert store.calls == 3
+
+
+def test_rows_are_not_dead_lettered_while_the_database_is_down(store, tmp_path):
+    store.down = True
+    writer = make_writer(tmp_path, max_attempts=1)
+    for i in range(3):
+        writer.submit('chat', chat_row(number=i))
+    time.sleep(0.3)
+
+    assert writer.pending_count() == 3
+    assert not (tmp_path / "dead.jsonl").exists()
+    store.down = False
+    assert writer.flush(timeout=2)
+    writer.stop()
+
+
+def test_full_queue_never_makes_the_caller_wait_for_the_database(store, tmp_path):
+    store.delay = 0.2
+    writer = make_writer(tmp_path, max_size=1, batch_size=1)
+    started = time.perf_counter()
+    ids = [writer.submit('chat', chat_row(number=i)) for i in range(5)]
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.15
+    assert writer.flush(timeout=5)
+    writer.stop()
+    assert set(store.rows) == set(ids)
+
+
+def test_a_row_the_database_refuses_is_dead_lettered_without_opening_the_breaker(sqlite_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(persistence, "get_db", lambda: sqlite_db)
+    monkeypatch.setattr(persistence, "PERSIST_RETRY_DELAY", 0.01)
+    writer = make_writer(tmp_path, max_attempts=3)
+    poison = writer.submit('chat', {'user_id': 'u1', 'question': "q", 'answer': None})
+    good = writer.submit('chat', chat_row())
+
+    assert writer.flush(timeout=5)
+    writer.stop()
+    dead = [json.loads(line)['row']['id'] for line in (tmp_path / "dead.jsonl").read_text().splitlines()]
+    assert dead == [poison]
+    assert [row['id'] for row in sqlite_db.get_chat_history('u1')] == [good]
+    assert sqlite_db.breaker.state == 'closed'
@@ -0,0 +1,42 @@
+# tests/test_prompt_builder.py
+
+import pytest
+
+import metrics
+import prompt_builder
+
+
+class BrokenTiktoken:
+    """tiktoken whose encoding cannot be loaded, as when its BPE file cannot be downloaded"""
+
+    def __init__(self):
+        self.attempts = 0
+
+    def get_encoding(self, name):
+        self.attempts += 1
+        raise OSError("no network")
+
+
+@pytest.fixture
+def broken_tiktoken(monkeypatch):
+    broken = BrokenTiktoken()
+    monkeypatch.setattr(prompt_builder, "tiktoken", broken)
+    monkeypatch.setattr(prompt_builder, "_encoding", None)
+    monkeypatch.setattr(prompt_builder, "_encoding_failed", False)
+    return broken
+
+
+def test_a_failed_tokenizer_load_is_tried_once_then_estimated(broken_tiktoken):
+    counts = [prompt_builder.count_tokens("x" * 40) for _ in range(5)]
+
+    assert counts == [10] * 5
+    assert broken_tiktoken.attempts == 1
+    assert metrics.get_counter("tokenizer_load_failures") == 1
+
+
+def test_truncation_uses_the_estimate_after_a_failed_load(broken_tiktoken):
+    text = prompt_builder.truncate_to_tokens("word " * 100, 10)
+
+    assert text.endswith(prompt_builder.TRUNCATION_MARKER)
+    assert prompt_builder.count_tokens(text) <= 10
+    assert broken_tiktoken.attempts == 1
@@ -0,0 +1,98 @@
+# tests/test_response_cache.py
+
+import pytest
+
+import chat
+from response_cache import ResponseCache, has_relevant_context
+
+# user-a's past turn has nothing to do with the diet question, user-c's is the turn it follows up on
+HISTORY = {
+    'user-a': [{'question': "My glucose was 310 this morning", 'answer': "SECRET-A reading noted",
+                'similarity': 0.12}],
+    'user-b': [],
+    'user-c': [{'question': "What should I eat for lunch with diabetes?", 'answer': "SECRET-C lentils and salad",
+                'similarity': 0.61}],
+}
+SUMMARIES = {'user-a': "SECRET-A summary: talked about a 310 glucose reading", 'user-b': "",
+             'user-c': "SECRET-C summary: planning diabetic meals"}
+
+
+class SessionState(dict):
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+class FakeStreamlit:
+    def __init__(self):
+        self.session_state = SessionState()
+
+
+class FakeDB:
+    def get_user_medical_info(self, user_id):
+        return []
+
+    def get_relevant_chat_history(self, user_id, question, limit=5):
+        return HISTORY[user_id]
+
+
+class EchoChain:
+    """Answers with everything it was given, so any leaked context shows up in the answer"""
+
+    def invoke(self, inputs):
+        return f"Answer to {inputs['question']} given {inputs['conversation_context']}"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache(semantic=False)
+    monkeypatch.setattr(chat, "st", FakeStreamlit())
+    monkeypatch.setattr(chat, "get_db", FakeDB)
+    monkeypatch.setattr(chat, "get_chat_chain", EchoChain)
+    monkeypatch.setattr(chat, "get_response_cache", lambda: cache)
+    monkeypatch.setattr(chat, "get_summary_text", SUMMARIES.get)
+    monkeypatch.setattr(chat, "record_prompt_tokens", lambda *args: None)
+    monkeypatch.setattr(chat, "save_chat_async", lambda *args: None)
+    monkeypatch.setattr(chat, "record_turn", lambda user_id: None)
+    return cache
+
+
+def test_cached_answer_never_carries_another_users_history(cache):
+    first = chat.process_query("What foods help with diabetes?", 'user-a')
+    second = chat.process_query("what foods help with diabetes", 'user-b')
+
+    assert "SECRET-A" not in first
+    assert second == first
+    assert cache.stats()['hits'] == 1
+
+
+def test_follow_ups_keep_their_context_and_skip_the_cache(cache):
+    shared = chat.process_query("What foods help with diabetes?", 'user-b')
+    follow_up = chat.process_query("What foods help with diabetes?", 'user-c')
+
+    assert follow_up != shared
+    assert "SECRET-C lentils" in follow_up and "SECRET-C summary" in follow_up
+    assert cache.stats()['hits'] == 0
+    assert cache.stats()['entries'] == 1
+
+
+def test_unscored_history_counts_as_relevant():
+    assert has_relevant_context([{'question': "recent turn", 'answer': "no score"}])
+    assert not has_relevant_context([{'question': "old turn", 'answer': "unrelated", 'similarity': 0.1}])
+    assert not has_relevant_context([])
+
+
+def test_personal_questions_use_history_and_are_not_cached(cache):
+    answer = chat.process_query("What did you say about my results last time?", 'user-a')
+    other = chat.process_query("What did you say about my results last time?", 'user-b')
+
+    assert "SECRET-A" in answer
+    assert "SECRET-A" not in other
+    assert cache.stats()['entries'] == 0
+
+
+def test_entries_are_keyed_by_medical_conditions():
+    cache = ResponseCache(semantic=False)
+    cache.set("Is walking good exercise?", "Diabetes, Asthma", "answer for diabetes and asthma")
+
+    assert cache.get("is walking good exercise", "asthma, diabetes") == "answer for diabetes and asthma"
+    assert cache.get("is walking good exercise", "None specified") is None
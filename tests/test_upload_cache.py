@@ -0,0 +1,62 @@
+# tests/test_upload_cache.py
+
+import io
+
+import metrics
+from upload_cache import UploadCache, content_hash
+
+
+def stored_extractions(db, user_id):
+    return db.client.table('medicalinfo').select('content, content_hash').eq('user_id', user_id).execute().data
+
+
+def test_content_hash_is_the_same_for_bytes_and_file_objects():
+    upload = io.BytesIO(b"x" * 5000)
+    upload.seek(10)
+
+    assert content_hash(upload, chunk_size=1024) == content_hash(b"x" * 5000)
+    assert upload.tell() == 10
+
+
+def test_a_stored_extraction_is_a_hit_for_its_owner_only(sqlite_db):
+    digest = content_hash(b"scan")
+    assert sqlite_db.save_extracted_document('u1', "HbA1c 6.1%", digest)
+    cache = UploadCache(db=sqlite_db)
+
+    assert cache.get('u1', digest) == "HbA1c 6.1%"
+    assert cache.get('u2', digest) is None
+    assert metrics.get_counter("upload_cache_hits") == 1
+    assert metrics.get_counter("upload_cache_misses") == 1
+
+
+def test_hits_are_served_from_memory_after_the_first_lookup(sqlite_db):
+    digest = content_hash(b"scan")
+    sqlite_db.save_extracted_document('u1', "HbA1c 6.1%", digest)
+    cache = UploadCache(db=sqlite_db)
+    cache.get('u1', digest)
+
+    sqlite_db.client.table('medicalinfo').delete().eq('user_id', 'u1').execute()
+    assert cache.get('u1', digest) == "HbA1c 6.1%"
+    assert cache.stats()['entries'] == 1
+
+
+def test_reprocessing_a_file_replaces_its_extraction(sqlite_db):
+    digest = content_hash(b"scan")
+    cache = UploadCache(db=sqlite_db)
+    sqlite_db.save_extracted_document('u1', "first pass", digest)
+    cache.set('u1', digest, "first pass")
+
+    # The force path skips the cache lookup, extracts again and stores under the same hash
+    assert sqlite_db.save_extracted_document('u1', "second pass", digest)
+    cache.set('u1', digest, "second pass")
+
+    assert stored_extractions(sqlite_db, 'u1') == [{'content': "second pass", 'content_hash': digest}]
+    assert cache.get('u1', digest) == "second pass"
+    assert UploadCache(db=sqlite_db).get('u1', digest) == "second pass"
+
+
+def test_documents_without_a_hash_are_all_kept(sqlite_db):
+    sqlite_db.save_extracted_document('u1', "one")
+    sqlite_db.save_extracted_document('u1', "two")
+
+    assert len(stored_extractions(sqlite_db, 'u1')) == 2
@@ -0,0 +1,92 @@
+# upload_cache.py
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import metrics
+from database import get_db
+
+UPLOAD_CACHE_SIZE = int(os.getenv("UPLOAD_CACHE_SIZE", "256"))
+UPLOAD_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(upload, chunk_size=UPLOAD_HASH_CHUNK_SIZE):
+    """SHA-256 hex digest of an uploaded file (file-like object or bytes), read in chunks"""
+    digest = hashlib.sha256()
+    if isinstance(upload, (bytes, bytearray, memoryview)):
+        digest.update(upload)
+        return digest.hexdigest()
+
+    position = upload.tell()
+    upload.seek(0)
+    for chunk in iter(lambda: upload.read(chunk_size), b''):
+        digest.update(chunk)
+    upload.seek(position)
+    return digest.hexdigest()
+
+
+class UploadCache:
+    """Text extracted from earlier uploads, keyed by user and content hash.
+
+    A small in-process LRU sits in front of the medicalinfo table, which holds every
+    extraction with its hash, so identical files are recognised across restarts too.
+    """
+
+    def __init__(self, max_size=UPLOAD_CACHE_SIZE, db=None):
+        self.max_size = max_size
+        self.db = db
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, key, text):
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, user_id, digest):
+        """Return the stored extraction for this user's file, or None, recording hit/miss metrics"""
+        key = (user_id, digest)
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+        if text is None:
+            text = (self.db or get_db()).get_extracted_document(user_id, digest)
+            if text is not None:
+                self._remember(key, text)
+
+        metrics.increment("upload_cache_hits" if text is not None else "upload_cache_misses")
+        return text
+
+    def set(self, user_id, digest, text):
+        """Remember an extraction that was just stored"""
+        self._remember((user_id, digest), text)
+
+    def stats(self):
+        """Return hit/miss counters and the number of extractions held in memory"""
+        hits = metrics.get_counter("upload_cache_hits")
+        misses = metrics.get_counter("upload_cache_misses")
+        with self._lock:
+            size = len(self._entries)
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+            'entries': size
+        }
+
+
+_lock = threading.Lock()
+_upload_cache = None
+
+
+def get_upload_cache():
+    """Return the process-wide upload cache"""
+    global _upload_cache
+    with _lock:
+        if _upload_cache is None:
+            _upload_cache = UploadCache()
+        return _upload_cache
@@ -0,0 +1,138 @@
+# webhook_client.py
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+import metrics
+
+N8N_WEBHOOK_URL = os.getenv("N8N_WEBHOOK_URL", "webhook-endpoint")
+WEBHOOK_CONNECT_TIMEOUT = float(os.getenv("WEBHOOK_CONNECT_TIMEOUT", "5"))
+WEBHOOK_READ_TIMEOUT = float(os.getenv("WEBHOOK_READ_TIMEOUT", "30"))
+# Uploads wait for the Drive round trip, OCR and the agent before n8n answers
+WEBHOOK_UPLOAD_READ_TIMEOUT = float(os.getenv("WEBHOOK_UPLOAD_READ_TIMEOUT", "300"))
+WEBHOOK_POOL_SIZE = int(os.getenv("WEBHOOK_POOL_SIZE", "8"))
+WEBHOOK_JOB_WORKERS = int(os.getenv("WEBHOOK_JOB_WORKERS", "4"))
+# Finished jobs nobody collected (the user left the page) are dropped after this many seconds
+WEBHOOK_JOB_TTL = float(os.getenv("WEBHOOK_JOB_TTL", "3600"))
+
+
+class WebhookError(Exception):
+    """Raised when the webhook answers with a non-200 status"""
+
+    def __init__(self, status_code, body=""):
+        super().__init__(f"Webhook returned status {status_code}")
+        self.status_code = status_code
+        self.body = body
+
+
+class WebhookClient:
+    """Client for the n8n webhook over one keep-alive session shared by the whole process.
+
+    Slow calls (file uploads) can be submitted as background jobs and polled by id,
+    so the Streamlit script returns while n8n is still working.
+    """
+
+    def __init__(self, url=N8N_WEBHOOK_URL, pool_size=WEBHOOK_POOL_SIZE, connect_timeout=WEBHOOK_CONNECT_TIMEOUT,
+                 read_timeout=WEBHOOK_READ_TIMEOUT, upload_read_timeout=WEBHOOK_UPLOAD_READ_TIMEOUT,
+                 job_workers=WEBHOOK_JOB_WORKERS, job_ttl=WEBHOOK_JOB_TTL):
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.upload_read_timeout = upload_read_timeout
+        self.job_ttl = job_ttl
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, job_workers), thread_name_prefix="webhook-job")
+
+    def _post(self, name, read_timeout, **kwargs):
+        """POST to the webhook and return the response text, raising WebhookError on a bad status"""
+        metrics.increment(f"webhook_{name}_requests")
+        with metrics.timer(f"webhook_{name}"):
+            response = self.session.post(self.url, timeout=(self.connect_timeout, read_timeout), **kwargs)
+        if response.status_code != 200:
+            metrics.increment("webhook_errors")
+            raise WebhookError(response.status_code, response.text)
+        return response.text
+
+    def send_chat(self, prompt, user_id):
+        """Send a chat prompt and return the agent's answer"""
+        return self._post('chat', self.read_timeout, json={'chatInput': prompt, "userId": user_id})
+
+    def upload_file(self, filename, content, content_type, ids, user_id):
+        """Upload a document (bytes) and return the text n8n extracted from it"""
+        return self._post('upload', self.upload_read_timeout,
+                          files={'data': (filename, content, content_type)},
+                          data={'name': filename, "id": ids, "userId": user_id})
+
+    def _expire_jobs(self, now):
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job['finished'] and now - job['finished'] > self.job_ttl]:
+            del self._jobs[job_id]
+
+    def submit(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) in the background and return a job id to poll"""
+        job_id = str(uuid.uuid4())
+        job = {'id': job_id, 'status': 'running', 'result': None, 'error': None,
+               'submitted': time.time(), 'finished': None}
+
+        def run():
+            try:
+                result, status, error = fn(*args, **kwargs), 'done', None
+            except Exception as e:
+                result, status, error = None, 'failed', e
+            with self._lock:
+                job.update(result=result, status=status, error=error, finished=time.time())
+            metrics.record_timing("webhook_job", job['finished'] - job['submitted'])
+
+        with self._lock:
+            self._expire_jobs(time.time())
+            self._jobs[job_id] = job
+        metrics.increment("webhook_jobs_submitted")
+        self._executor.submit(run)
+        return job_id
+
+    def submit_upload(self, filename, content, content_type, ids, user_id):
+        """Start an upload in the background and return its job id"""
+        return self.submit(self.upload_file, filename, content, content_type, ids, user_id)
+
+    def job_status(self, job_id):
+        """Return a copy of the job's state ('running', 'done' or 'failed'), or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def pop_job(self, job_id):
+        """Return a finished job and forget it; running or unknown jobs return None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] == 'running':
+                return None
+            return self._jobs.pop(job_id)
+
+    def close(self):
+        """Close pooled connections and stop accepting jobs"""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+_lock = threading.Lock()
+_webhook_client = None
+
+
+def get_webhook_client():
+    """Return the process-wide webhook client"""
+    global _webhook_client
+    with _lock:
+        if _webhook_client is None:
+            _webhook_client = WebhookClient()
+        return _webhook_client